@@ -1,11 +1,26 @@
 # main.py
 import os
+import re
+import json
+import math
+import random
+import bisect
+import hashlib
+import html
+import zlib
 import time
+import codecs
 import sqlite3
+import threading
 import requests
 import feedparser
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
-from urllib.parse import urlencode
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit, parse_qsl
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 
 # --- Configuration (from env) ---
 ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
@@ -13,9 +28,27 @@ ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")  # your telegram chat id
 POLL_SECONDS = int(os.getenv("POLL_SECONDS", "120"))  # default every 2 minutes
+FETCH_DEADLINE_SECONDS = int(os.getenv("FETCH_DEADLINE_SECONDS", "30"))  # whole fetch stage per cycle
+PAGINATION_MAX_PAGES = int(os.getenv("PAGINATION_MAX_PAGES", "5"))  # pages per poll while they keep yielding new items
+TIMEOUT_P99_MULTIPLIER = float(os.getenv("TIMEOUT_P99_MULTIPLIER", "2"))  # adaptive timeout = p99 x this
+TIMEOUT_FLOOR = float(os.getenv("TIMEOUT_FLOOR", "3"))
+TIMEOUT_CAP = float(os.getenv("TIMEOUT_CAP", "30"))
+SCHEDULER_MIN_SECONDS = int(os.getenv("SCHEDULER_MIN_SECONDS", "60"))  # fastest any source is polled
+SCHEDULER_MAX_SECONDS = int(os.getenv("SCHEDULER_MAX_SECONDS", "1800"))  # slowest any source is polled
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))  # +/- fraction of each interval
 COUNTRY = os.getenv("COUNTRY", "us")
 REMOTE_ONLY = os.getenv("REMOTE_ONLY", "1")  # filter remote roles if available
 
+# RapidAPI request pacing per host and key (x-ratelimit-* headers refine it)
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "1"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "2"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5"))  # seconds to queue before deferring
+
+# Monthly RapidAPI request budget per key (override per host with e.g. JSEARCH_MONTHLY_BUDGET)
+RAPIDAPI_MONTHLY_BUDGET = int(os.getenv("RAPIDAPI_MONTHLY_BUDGET", "500"))
+QUOTA_BILLING_DAY = int(os.getenv("QUOTA_BILLING_DAY", "1"))  # day of month the quota resets (1-28)
+
+# API keys may be comma-separated to rotate across several subscriptions
 # JSearch API Configuration
 JSEARCH_API_KEY = os.getenv("JSEARCH_API_KEY")
 JSEARCH_HOST = "jsearch.p.rapidapi.com"
@@ -36,6 +69,25 @@ GLASSDOOR_HOST = "glassdoor-real-time.p.rapidapi.com"
 INDEED_API_KEY = os.getenv("INDEED_API_KEY")
 INDEED_HOST = "indeed12.p.rapidapi.com"
 
+# Sources to poll: (adapter, display name, source id, params over the adapter's defaults).
+# Searching another country or query is one more line here, or an EXTRA_SOURCES
+# entry such as "glassdoor?location=Germany;indeed?location=London&locality=gb"
+SOURCE_CONFIG = [
+    ("remoteok", "RemoteOK", "remoteok", {}),
+    ("jsearch", "JSearch API", "jsearch", {}),
+    ("linkedin", "LinkedIn Jobs", "linkedin", {}),
+    ("active_jobs", "Active Jobs API", "active_jobs", {}),
+    ("indeed", "Indeed Jobs", "indeed", {}),
+    ("glassdoor", "Glassdoor Jobs", "glassdoor", {}),
+    ("glassdoor", "Glassdoor Jobs (CA)", "glassdoor_ca", {"location": "Canada"}),
+    ("rss", "Stack Overflow Jobs", "stackoverflow", {"url": "https://stackoverflow.com/jobs/feed"}),
+    ("adzuna", "Adzuna", "adzuna", {}),
+]
+EXTRA_SOURCES = os.getenv("EXTRA_SOURCES", "")
+
+# Extra RSS/Atom job feeds, comma-separated URLs
+RSS_FEEDS = [u.strip() for u in os.getenv("RSS_FEEDS", "").split(",") if u.strip()]
+
 # Keywords from resume (extendable)
 KEYWORDS = [
     "full stack","full-stack","fullstack","frontend","backend","react","typescript",
@@ -48,49 +100,907 @@ KEYWORDS = [
     "gcp","serverless","lambda","kubernetes","k8s","agile","scrum"
 ]
 
+# Most upstream queries one source may split KEYWORDS into per poll
+QUERY_MAX_SPLITS = int(os.getenv("QUERY_MAX_SPLITS", "4"))
+
+# Keywords this short only match as whole words ("ai" must not hit "maintain")
+KEYWORD_WHOLE_WORD_MAX = int(os.getenv("KEYWORD_WHOLE_WORD_MAX", "4"))
+
+# Descriptions are converted from HTML to plain text and cut to this many characters
+DESCRIPTION_MAX_CHARS = int(os.getenv("DESCRIPTION_MAX_CHARS", "8000"))
+HTML_CACHE_SIZE = int(os.getenv("HTML_CACHE_SIZE", "5000"))  # normalized descriptions kept in memory
+
 # Experience cap in years
 MAX_YEARS_EXP = int(os.getenv("MAX_YEARS_EXP", "5"))
 
 # DB for seen jobs
 DB_PATH = os.getenv("DB_PATH", "/app/seen_jobs.db")
 
+# In-memory seen-ID cache in front of the DB
+SEEN_BLOOM_CAPACITY = int(os.getenv("SEEN_BLOOM_CAPACITY", "200000"))  # expected number of seen IDs
+SEEN_BLOOM_FP_RATE = float(os.getenv("SEEN_BLOOM_FP_RATE", "0.001"))
+SEEN_RECENT_IDS = int(os.getenv("SEEN_RECENT_IDS", "5000"))
+
+# Keep each job's upstream payload (zlib-compressed) for debugging
+KEEP_RAW_PAYLOADS = os.getenv("KEEP_RAW_PAYLOADS", "0") == "1"
+
+# Circuit breaker per source: open after this many consecutive failures,
+# then probe with exponential backoff
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_BASE_SECONDS = int(os.getenv("BREAKER_BASE_SECONDS", "300"))
+BREAKER_MAX_SECONDS = int(os.getenv("BREAKER_MAX_SECONDS", "86400"))
+
+# Per-source watermarks: how far behind the newest processed posting to
+# keep looking (late-indexed postings), and how far back after downtime
+WATERMARK_GRACE_MINUTES = int(os.getenv("WATERMARK_GRACE_MINUTES", "60"))
+WATERMARK_MAX_LOOKBACK_HOURS = int(os.getenv("WATERMARK_MAX_LOOKBACK_HOURS", "72"))
+
+# Window for collapsing the same posting seen on several boards
+DUPLICATE_WINDOW_HOURS = int(os.getenv("DUPLICATE_WINDOW_HOURS", "72"))
+
+# Retention for seen_jobs
+SEEN_RETENTION_DAYS = int(os.getenv("SEEN_RETENTION_DAYS", "30"))
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+PRUNE_BATCH = 500  # rows deleted per transaction
+# Filter decisions remembered per item fingerprint (in memory and in the DB)
+DECISION_MEMO_SIZE = int(os.getenv("DECISION_MEMO_SIZE", "20000"))
+VACUUM_PAGES = 1000  # free pages returned per incremental vacuum
+
+# --- Job record ---
+@dataclass(slots=True)
+class Job:
+    """One matched posting, in the same shape for every source.
+    
+    Source-specific details (LinkedIn company size, Glassdoor rating, ...)
+    go in extras. The upstream payload is only kept, zlib-compressed, when
+    KEEP_RAW_PAYLOADS is set.
+    """
+    id: str
+    source: str
+    title: str = None
+    company: str = None
+    url: str = None
+    created_at: str = None
+    location: str = ""
+    is_remote: bool = None
+    salary_min: float = None
+    salary_max: float = None
+    salary_type: str = None
+    employment_type: str = None
+    extras: dict = field(default_factory=dict)
+    also_on: list = field(default_factory=list)
+    adapter: str = None            # label of the SourceAdapter that parsed it
+    raw: bytes = None
+    
+    def raw_payload(self):
+        return json.loads(zlib.decompress(self.raw)) if self.raw else None
+
+def pack_raw(item):
+    if not KEEP_RAW_PAYLOADS:
+        return None
+    return zlib.compress(json.dumps(item, default=str).encode("utf-8"))
+
+# --- Job IDs ---
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid",
+                    "ref", "referer", "referrer", "src", "source", "trk", "trackingid", "refid"}
+
+def canonical_url(url):
+    """URL with tracking params, fragment and case/slash noise removed"""
+    parts = urlsplit((url or "").strip())
+    if not parts.netloc:
+        return (url or "").strip()
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    return f"{parts.scheme.lower() or 'https'}://{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+def make_job_id(source, native_id=None, url=None, *content):
+    """Stable job ID: the upstream ID when there is one, else a content hash.
+    
+    Hashes use a fixed algorithm (not Python's per-process hash()), so IDs
+    survive restarts and seen_jobs keeps working across deploys.
+    """
+    if native_id not in (None, ""):
+        return f"{source}_{native_id}"
+    basis = canonical_url(url) if url else "\x1f".join(str(c or "").strip().lower() for c in content)
+    return f"{source}_{hashlib.blake2b(basis.encode('utf-8'), digest_size=10).hexdigest()}"
+
+# --- Seen-ID cache ---
+class BloomFilter:
+    """Fixed-size Bloom filter over string IDs (double hashing on one blake2b digest)"""
+    
+    def __init__(self, capacity, fp_rate):
+        capacity = max(1, capacity)
+        self.bits = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+    
+    def add(self, key):
+        for p in self._positions(key):
+            self.array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+    
+    def __contains__(self, key):
+        return all(self.array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+    
+    def false_positive_rate(self):
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+class SeenCache:
+    """Warm in-process front for seen_jobs.
+    
+    A Bloom miss means the ID was never seen, so SQLite is skipped. IDs in
+    the bounded recent set are known seen. Only the rest (possible Bloom
+    hits) need confirming against the table.
+    """
+    
+    def __init__(self, capacity=SEEN_BLOOM_CAPACITY, fp_rate=SEEN_BLOOM_FP_RATE, recent_size=SEEN_RECENT_IDS):
+        self.bloom = BloomFilter(capacity, fp_rate)
+        self.recent = OrderedDict()
+        self.recent_size = recent_size
+    
+    def add(self, job_id):
+        if job_id not in self.bloom:
+            self.bloom.add(job_id)
+        self.recent[job_id] = True
+        self.recent.move_to_end(job_id)
+        if len(self.recent) > self.recent_size:
+            self.recent.popitem(last=False)
+    
+    def split(self, ids):
+        """Split ids into (known seen, need confirming); the rest are definitely new"""
+        known, maybe = set(), []
+        for job_id in ids:
+            if job_id in self.recent:
+                self.recent.move_to_end(job_id)
+                known.add(job_id)
+            elif job_id in self.bloom:
+                maybe.append(job_id)
+        return known, maybe
+    
+    def report(self):
+        b = self.bloom
+        return (f"Seen cache: {b.count} ids, bloom {len(b.array) / 1024:.0f} KB (k={b.hashes}), "
+                f"est. false-positive rate {b.false_positive_rate():.4%}, recent set {len(self.recent)}/{self.recent_size}")
+
 # --- DB helpers ---
+class SeenStore:
+    """Seen-jobs store on one SQLite connection kept for the life of the process.
+    
+    Lookups and inserts are batched: a whole batch of candidate IDs is
+    resolved with one query and new jobs are written in one transaction.
+    Fetcher threads share the connection through a lock.
+    """
+    
+    BATCH = 500  # stay well under SQLite's bound-parameter limit
+    
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # auto_vacuum only takes effect on a new DB or after a full VACUUM,
+        # so existing DBs pay one VACUUM to switch to incremental mode
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.conn.execute("VACUUM")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                id TEXT PRIMARY KEY,
+                source TEXT,
+                title TEXT,
+                company TEXT,
+                created_at TEXT,
+                created_epoch INTEGER,
+                location TEXT
+            )
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(seen_jobs)")]
+            if "created_epoch" not in columns:
+                self.conn.execute("ALTER TABLE seen_jobs ADD COLUMN created_epoch INTEGER")
+            if "location" not in columns:
+                self.conn.execute("ALTER TABLE seen_jobs ADD COLUMN location TEXT")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_jobs_created_epoch ON seen_jobs (created_epoch)")
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS quota_ledger (
+                period TEXT,
+                host TEXT,
+                key_id TEXT,
+                calls INTEGER,
+                PRIMARY KEY (period, host, key_id)
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS source_breakers (
+                source TEXT PRIMARY KEY,
+                failures INTEGER,
+                open_until REAL,
+                backoff REAL
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS source_watermarks (
+                source TEXT PRIMARY KEY,
+                posted_epoch INTEGER,
+                job_id TEXT,
+                updated_epoch INTEGER
+            )
+            """)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS decision_memo (
+                fingerprint BLOB PRIMARY KEY,
+                decision TEXT,
+                used_epoch INTEGER
+            )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_decision_memo_used_epoch ON decision_memo (used_epoch)")
+        self._backfill_epochs()
+        self.cache = SeenCache()
+        # oldest first, so the newest IDs end up in the recent set
+        for (job_id,) in self.conn.execute("SELECT id FROM seen_jobs ORDER BY rowid"):
+            self.cache.add(job_id)
+    
+    def seen_ids(self, ids):
+        """Return the subset of ids already in seen_jobs"""
+        ids = list(dict.fromkeys(ids))
+        with self.lock:
+            seen, ids = self.cache.split(ids)
+            for i in range(0, len(ids), self.BATCH):
+                chunk = ids[i:i + self.BATCH]
+                marks = ",".join("?" * len(chunk))
+                rows = self.conn.execute(f"SELECT id FROM seen_jobs WHERE id IN ({marks})", chunk)
+                seen.update(row[0] for row in rows)
+        return seen
+    
+    def _backfill_epochs(self):
+        # Rows written before created_epoch existed; unparseable dates count as now
+        now = int(time.time())
+        rows = self.conn.execute("SELECT rowid, created_at FROM seen_jobs WHERE created_epoch IS NULL").fetchall()
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany("UPDATE seen_jobs SET created_epoch = ? WHERE rowid = ?",
+                                  [(parse_epoch(created) or now, rowid) for rowid, created in rows])
+        print(f"Backfilled created_epoch for {len(rows)} seen jobs")
+    
+    def mark_seen_many(self, jobs):
+        now = int(time.time())
+        rows = [(job.id, job.source, job.title, job.company, job.created_at,
+                 parse_epoch(job.created_at) or now, job.location or "") for job in jobs]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen_jobs (id, source, title, company, created_at, created_epoch, location) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            for row in rows:
+                self.cache.add(row[0])
+    
+    def recent_postings(self, since_epoch):
+        # Rows from before the location column can't be told apart from
+        # other offices of the same role, so they are left out
+        with self.lock:
+            return self.conn.execute(
+                "SELECT id, source, title, company, location, created_epoch FROM seen_jobs "
+                "WHERE created_epoch >= ? AND location IS NOT NULL ORDER BY created_epoch",
+                (since_epoch,)).fetchall()
+    
+    def get_validators(self, key):
+        with self.lock:
+            r = self.conn.execute("SELECT etag, last_modified FROM http_validators WHERE url = ?", (key,)).fetchone()
+        return r if r else (None, None)
+    
+    def save_validators(self, key, etag, last_modified):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO http_validators (url, etag, last_modified) VALUES (?, ?, ?)",
+                              (key, etag, last_modified))
+    
+    def get_watermark(self, source):
+        with self.lock:
+            return self.conn.execute("SELECT posted_epoch, job_id FROM source_watermarks WHERE source = ?", (source,)).fetchone()
+    
+    def save_watermark(self, source, posted_epoch, job_id):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO source_watermarks (source, posted_epoch, job_id, updated_epoch) VALUES (?, ?, ?, ?)",
+                              (source, posted_epoch, job_id, int(time.time())))
+    
+    def get_breaker(self, source):
+        with self.lock:
+            return self.conn.execute("SELECT failures, open_until, backoff FROM source_breakers WHERE source = ?", (source,)).fetchone()
+    
+    def save_breaker(self, source, failures, open_until, backoff):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO source_breakers (source, failures, open_until, backoff) VALUES (?, ?, ?, ?)",
+                              (source, failures, open_until, backoff))
+    
+    def quota_calls(self, period):
+        with self.lock:
+            return self.conn.execute("SELECT host, key_id, calls FROM quota_ledger WHERE period = ?", (period,)).fetchall()
+    
+    def add_quota_call(self, period, host, kid):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO quota_ledger (period, host, key_id, calls) VALUES (?, ?, ?, 0)", (period, host, kid))
+            self.conn.execute("UPDATE quota_ledger SET calls = calls + 1 WHERE period = ? AND host = ? AND key_id = ?", (period, host, kid))
+    
+    def load_decisions(self, limit):
+        with self.lock:
+            return self.conn.execute("SELECT fingerprint, decision, used_epoch FROM decision_memo ORDER BY used_epoch DESC LIMIT ?",
+                                     (limit,)).fetchall()
+    
+    def save_decisions(self, rows):
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO decision_memo (fingerprint, decision, used_epoch) VALUES (?, ?, ?)", rows)
+    
+    def trim_decisions(self, keep):
+        """Drop all but the keep most recently used memo rows"""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "DELETE FROM decision_memo WHERE used_epoch < (SELECT used_epoch FROM decision_memo ORDER BY used_epoch DESC LIMIT 1 OFFSET ?)",
+                (keep,)).rowcount
+    
+    def prune(self, horizon_epoch, batch=PRUNE_BATCH):
+        """Delete rows created before horizon_epoch, one small batch per lock hold"""
+        deleted = 0
+        while True:
+            with self.lock, self.conn:
+                n = self.conn.execute(
+                    "DELETE FROM seen_jobs WHERE rowid IN (SELECT rowid FROM seen_jobs WHERE created_epoch < ? LIMIT ?)",
+                    (horizon_epoch, batch)).rowcount
+            deleted += n
+            if n < batch:
+                break
+            time.sleep(0.05)  # let the poll loop in between batches
+        with self.lock:
+            self.conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})").fetchall()
+        return deleted
+    
+    def start_retention(self, interval=RETENTION_INTERVAL_SECONDS):
+        def run():
+            while True:
+                try:
+                    horizon = int(time.time()) - SEEN_RETENTION_DAYS * 86400
+                    deleted = self.prune(horizon)
+                    if deleted:
+                        print(f"Retention: pruned {deleted} seen jobs older than {SEEN_RETENTION_DAYS} days")
+                    self.trim_decisions(DECISION_MEMO_SIZE)
+                except Exception as e:
+                    print("Retention error:", e)
+                time.sleep(interval)
+        
+        thread = threading.Thread(target=run, name="retention", daemon=True)
+        thread.start()
+        return thread
+
+STORE = None
+
 def init_db():
+    global STORE
     # Ensure the directory exists
-    import os
     db_dir = os.path.dirname(DB_PATH)
     if db_dir and not os.path.exists(db_dir):
         os.makedirs(db_dir, exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS seen_jobs (
-        id TEXT PRIMARY KEY,
-        source TEXT,
-        title TEXT,
-        company TEXT,
-        created_at TEXT
-    )
-    """)
-    conn.commit()
-    conn.close()
-
-def is_seen(job_id):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM seen_jobs WHERE id = ?", (job_id,))
-    r = cur.fetchone()
-    conn.close()
-    return bool(r)
-
-def mark_seen(job_id, source, title, company, created_at):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("INSERT OR IGNORE INTO seen_jobs (id, source, title, company, created_at) VALUES (?, ?, ?, ?, ?)",
-                (job_id, source, title, company, created_at))
-    conn.commit()
-    conn.close()
+    STORE = SeenStore(DB_PATH)
+    print(STORE.cache.report())
+    MEMO.load(STORE)
+    
+    # Warm the duplicate index with postings notified inside its window
+    since = int(time.time()) - DUPLICATE_WINDOW_HOURS * 3600
+    for job_id, source, title, company, location, created_epoch in STORE.recent_postings(since):
+        DUPES.add(job_id, source, title, company, location, added=created_epoch)
+
+# --- Rate limiting (RapidAPI) ---
+class RateLimited(Exception):
+    """Raised instead of sending a request that the upstream would reject"""
+
+class RateLimiter:
+    """Token bucket per (host, API key), corrected by the upstream's headers.
+    
+    Buckets refill at RATE_LIMIT_PER_SECOND up to RATE_LIMIT_BURST. A 429,
+    a Retry-After header or an x-ratelimit-*-remaining of 0 blocks the key
+    until the advertised reset. Callers wait up to RATE_LIMIT_MAX_WAIT for
+    a token; past that the request is deferred with RateLimited rather than
+    sent to fail.
+    """
+    
+    def __init__(self, rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_BURST, max_wait=RATE_LIMIT_MAX_WAIT):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.buckets = {}  # (host, key) -> {"tokens", "updated", "blocked_until", "remaining", "limit", "reset_at"}
+    
+    def _bucket(self, host, key):
+        bucket = self.buckets.get((host, key))
+        if bucket is None:
+            bucket = {"tokens": float(self.burst), "updated": time.monotonic(), "blocked_until": 0.0,
+                      "remaining": None, "limit": None, "reset_at": None}
+            self.buckets[(host, key)] = bucket
+        return bucket
+    
+    def acquire(self, host, key):
+        while True:
+            with self.lock:
+                bucket = self._bucket(host, key)
+                now = time.monotonic()
+                if bucket["blocked_until"] > now:
+                    raise RateLimited(f"{host} rate limited for another {bucket['blocked_until'] - now:.0f}s")
+                bucket["tokens"] = min(self.burst, bucket["tokens"] + (now - bucket["updated"]) * self.rate)
+                bucket["updated"] = now
+                if bucket["tokens"] >= 1:
+                    bucket["tokens"] -= 1
+                    return
+                wait = (1 - bucket["tokens"]) / self.rate
+            if wait > self.max_wait:
+                raise RateLimited(f"{host} has no request allowance for {wait:.1f}s")
+            time.sleep(wait)
+    
+    def update(self, host, key, r):
+        headers = r.headers
+        now = time.monotonic()
+        with self.lock:
+            bucket = self._bucket(host, key)
+            block = 0.0
+            retry_after = headers.get("Retry-After")
+            if retry_after:
+                try:
+                    block = float(retry_after)
+                except ValueError:
+                    retry_epoch = parse_epoch(retry_after)
+                    block = max(0.0, retry_epoch - time.time()) if retry_epoch else 60.0
+            elif r.status_code == 429:
+                block = 60.0
+            # RapidAPI: x-ratelimit-requests-remaining / -limit / -reset (seconds)
+            for name, value in headers.items():
+                lname = name.lower()
+                if not lname.startswith("x-ratelimit-") or not lname.endswith("-remaining"):
+                    continue
+                prefix = lname[:-len("remaining")]
+                try:
+                    remaining = int(value)
+                    reset = float(headers.get(prefix + "reset") or 0)
+                except ValueError:
+                    continue
+                # the tightest window wins
+                if bucket["remaining"] is None or remaining <= bucket["remaining"] or bucket["reset_at"] is None or bucket["reset_at"] <= now:
+                    bucket["remaining"] = remaining
+                    bucket["limit"] = headers.get(prefix + "limit")
+                    bucket["reset_at"] = now + reset if reset else None
+                if remaining <= 0 and reset:
+                    block = max(block, reset)
+            if block:
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + block)
+                bucket["tokens"] = 0.0
+    
+    def is_blocked(self, host, key):
+        with self.lock:
+            bucket = self.buckets.get((host, key))
+            return bool(bucket) and bucket["blocked_until"] > time.monotonic()
+    
+    def allowance(self):
+        """Remaining upstream allowance per host and (masked) key"""
+        now = time.monotonic()
+        report = {}
+        with self.lock:
+            for (host, key), bucket in self.buckets.items():
+                report[f"{host} [{(key or '')[:6]}…]"] = {
+                    "remaining": bucket["remaining"],
+                    "limit": bucket["limit"],
+                    "reset_in": round(bucket["reset_at"] - now) if bucket["reset_at"] else None,
+                    "blocked_for": round(max(0.0, bucket["blocked_until"] - now)),
+                }
+        return report
+
+# --- Monthly quota budget (RapidAPI) ---
+def split_keys(value):
+    return [k.strip() for k in (value or "").split(",") if k.strip()]
+
+def key_id(key):
+    # Ledger rows identify keys by a short digest, never the key itself
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+def billing_period(now=None, day=QUOTA_BILLING_DAY):
+    """(start, end) of the billing period containing now, in UTC"""
+    now = now or datetime.now(timezone.utc)
+    day = min(28, max(1, day))
+    start = now.replace(day=day, hour=0, minute=0, second=0, microsecond=0)
+    if now < start:
+        start = (start.replace(day=1) - timedelta(days=1)).replace(day=day)
+    end = (start.replace(day=1) + timedelta(days=32)).replace(day=day)
+    return start, end
+
+class QuotaLedger:
+    """Calls per (host, key) against a monthly budget, persisted in quota_ledger.
+    
+    pick_key() rotates to the key with the most budget left that the rate
+    limiter isn't blocking. min_interval() spreads what is left over the
+    rest of the billing period, which the scheduler uses as a floor.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = {}  # host -> [key, ...]
+        self.budgets = {}  # host -> calls per key per period
+        self.calls = {}  # (host, key id) -> calls this period
+        self.period = None
+    
+    def register(self, host, keys, budget):
+        self.keys[host] = list(keys)
+        self.budgets[host] = budget
+    
+    def _roll(self):
+        period = billing_period()[0].strftime("%Y-%m-%d")
+        if period != self.period:
+            self.period = period
+            self.calls = {}
+            if STORE is not None:
+                for host, kid, calls in STORE.quota_calls(period):
+                    self.calls[(host, kid)] = calls
+    
+    def remaining(self, host, key):
+        return self.budgets[host] - self.calls.get((host, key_id(key)), 0)
+    
+    def pick_key(self, host, limiter):
+        with self.lock:
+            self._roll()
+            usable = [k for k in self.keys[host] if self.remaining(host, k) > 0 and not limiter.is_blocked(host, k)]
+        if not usable:
+            raise RateLimited(f"{host}: monthly budget used up on every key")
+        return max(usable, key=lambda k: self.remaining(host, k))
+    
+    def record(self, host, key):
+        with self.lock:
+            self._roll()
+            kid = key_id(key)
+            self.calls[(host, kid)] = self.calls.get((host, kid), 0) + 1
+            period = self.period
+        if STORE is not None:
+            STORE.add_quota_call(period, host, kid)
+    
+    def exhaust(self, host, key):
+        # Upstream says this key is out even if our count disagrees
+        with self.lock:
+            self._roll()
+            self.calls[(host, key_id(key))] = self.budgets[host]
+    
+    def min_interval(self, host):
+        """Seconds between calls to host that spread the budget left over the period"""
+        with self.lock:
+            self._roll()
+            left = sum(max(0, self.remaining(host, k)) for k in self.keys.get(host, []))
+        seconds_left = (billing_period()[1] - datetime.now(timezone.utc)).total_seconds()
+        return seconds_left / left if left else seconds_left
+    
+    def report(self):
+        with self.lock:
+            self._roll()
+            lines = []
+            for host, keys in self.keys.items():
+                used = sum(self.calls.get((host, key_id(k)), 0) for k in keys)
+                lines.append(f"{host}: {used}/{self.budgets[host] * len(keys)} calls over {len(keys)} key(s)")
+        return lines
+
+# --- Latency tracking ---
+class LatencyHistogram:
+    """Decaying log-bucketed latency histogram for one host.
+    
+    Buckets grow by 25% from 50 ms to ~2 min. Once more than 500 samples
+    are held every count is halved, so old behaviour fades out.
+    """
+    
+    EDGES = [0.05 * 1.25 ** i for i in range(36)]
+    MAX_SAMPLES = 500
+    
+    def __init__(self):
+        self.counts = [0.0] * (len(self.EDGES) + 1)
+        self.total = 0.0
+    
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(self.EDGES, seconds)] += 1
+        self.total += 1
+        if self.total > self.MAX_SAMPLES:
+            self.counts = [c / 2 for c in self.counts]
+            self.total /= 2
+    
+    def quantile(self, q):
+        target = q * self.total
+        seen = 0.0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.EDGES[min(i, len(self.EDGES) - 1)]
+        return self.EDGES[-1]
+
+class LatencyTracker:
+    """Per-host latency histograms driving adaptive timeouts and hedging"""
+    
+    MIN_SAMPLES = 20  # until then callers' fixed timeouts apply
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}
+    
+    def record(self, host, seconds):
+        with self.lock:
+            self.hosts.setdefault(host, LatencyHistogram()).add(seconds)
+    
+    def _quantile(self, host, q):
+        with self.lock:
+            hist = self.hosts.get(host)
+            if hist is None or hist.total < self.MIN_SAMPLES:
+                return None
+            return hist.quantile(q)
+    
+    def timeout(self, host, default):
+        """p99 x TIMEOUT_P99_MULTIPLIER, kept within [TIMEOUT_FLOOR, TIMEOUT_CAP]"""
+        p99 = self._quantile(host, 0.99)
+        if p99 is None:
+            return default
+        return min(TIMEOUT_CAP, max(TIMEOUT_FLOOR, p99 * TIMEOUT_P99_MULTIPLIER))
+    
+    def hedge_delay(self, host):
+        return self._quantile(host, 0.95)
+    
+    def report(self):
+        with self.lock:
+            hosts = {host: hist for host, hist in self.hosts.items() if hist.total >= self.MIN_SAMPLES}
+            return [f"{host} p50 {h.quantile(0.5):.1f}s p95 {h.quantile(0.95):.1f}s p99 {h.quantile(0.99):.1f}s"
+                    for host, h in hosts.items()]
+
+# --- Shared HTTP client ---
+class HttpClient:
+    """One keep-alive session shared by every fetcher and the notifier.
+    
+    Connections are pooled per host, so the TCP+TLS handshake is paid once
+    per process instead of once per request. Default headers can be
+    registered per host and are merged into every request to that host.
+    
+    GET timeouts adapt to each host's observed latency. A GET still
+    waiting past the host's p95 gets a hedged duplicate and the first
+    response wins; hosts billed per call (RapidAPI) are never hedged.
+    """
+    
+    def __init__(self, pool_size=8):
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": "job-bot/1.0",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        self.adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.host_headers = {}
+        self.limited_hosts = set()
+        self.limiter = RateLimiter()
+        self.quota = QuotaLedger()
+        self.latency = LatencyTracker()
+        self.hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+        self.lock = threading.Lock()
+        self.requests_sent = 0
+        self.bytes_received = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+    
+    def set_default_headers(self, host, headers):
+        self.host_headers[host] = dict(headers)
+    
+    def rate_limit(self, host, keys=(), budget=RAPIDAPI_MONTHLY_BUDGET):
+        self.limited_hosts.add(host)
+        if keys:
+            self.quota.register(host, keys, budget)
+    
+    def request(self, method, url, headers=None, **kwargs):
+        host = urlsplit(url).hostname
+        if method != "GET":
+            return self._send(method, url, host, headers, kwargs)
+        kwargs["timeout"] = self.latency.timeout(host, kwargs.get("timeout"))
+        delay = None if host in self.limited_hosts else self.latency.hedge_delay(host)
+        if delay is None:
+            return self._send(method, url, host, headers, kwargs)
+        
+        first = self.hedge_pool.submit(self._send, method, url, host, headers, kwargs)
+        try:
+            return first.result(timeout=delay)
+        except FuturesTimeout:
+            pass
+        second = self.hedge_pool.submit(self._send, method, url, host, headers, kwargs)
+        with self.lock:
+            self.hedges_sent += 1
+        error = None
+        for future in as_completed([first, second]):
+            if future.exception() is None:
+                loser = second if future is first else first
+                # the slower copy is closed whenever it lands
+                loser.add_done_callback(lambda f: f.exception() is None and f.result().close())
+                if future is second:
+                    with self.lock:
+                        self.hedges_won += 1
+                return future.result()
+            error = future.exception()
+        raise error
+    
+    def _send(self, method, url, host, headers, kwargs):
+        merged = dict(self.host_headers.get(host, {}))
+        if headers:
+            merged.update(headers)
+        key = merged.get("x-rapidapi-key")
+        if host in self.quota.keys:
+            key = merged["x-rapidapi-key"] = self.quota.pick_key(host, self.limiter)
+        if host in self.limited_hosts:
+            self.limiter.acquire(host, key)
+        started = time.monotonic()
+        try:
+            r = self.session.request(method, url, headers=merged, **kwargs)
+        except requests.Timeout:
+            # a timeout is a latency sample too, or p99 would never grow
+            self.latency.record(host, time.monotonic() - started)
+            raise
+        self.latency.record(host, time.monotonic() - started)
+        if host in self.quota.keys:
+            self.quota.record(host, key)
+        if host in self.limited_hosts:
+            self.limiter.update(host, key, r)
+            if r.headers.get("x-ratelimit-requests-remaining") == "0":
+                self.quota.exhaust(host, key)
+        with self.lock:
+            self.requests_sent += 1
+        # streamed bodies are counted by whoever consumes them
+        if not kwargs.get("stream"):
+            self.count_bytes(r)
+        return r
+    
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+    
+    def count_bytes(self, r):
+        # Wire bytes (before gzip decoding) when urllib3 exposes them
+        try:
+            wire = r.raw.tell() or len(r.content)
+        except Exception:
+            wire = len(r._content or b"")
+        with self.lock:
+            self.bytes_received += wire
+    
+    def stats(self):
+        with self.lock:
+            stats = {"requests": self.requests_sent, "bytes": self.bytes_received}
+        # urllib3 counts every request and every fresh connection per pool
+        pools = self.adapter.poolmanager.pools
+        pools = [pools[k] for k in pools.keys() if k in pools]
+        opened = sum(p.num_connections for p in pools)
+        served = sum(p.num_requests for p in pools)
+        stats["connections"] = opened
+        stats["reused"] = max(0, served - opened)
+        return stats
+
+HTTP = HttpClient()
+for _host, _keys, _prefix in [
+    (JSEARCH_HOST, JSEARCH_API_KEY, "JSEARCH"),
+    (ACTIVE_JOBS_HOST, ACTIVE_JOBS_API_KEY, "ACTIVE_JOBS"),
+    (LINKEDIN_JOBS_HOST, LINKEDIN_JOBS_API_KEY, "LINKEDIN_JOBS"),
+    (GLASSDOOR_HOST, GLASSDOOR_API_KEY, "GLASSDOOR"),
+    (INDEED_HOST, INDEED_API_KEY, "INDEED"),
+]:
+    # the key itself is picked per request from the rotation
+    HTTP.set_default_headers(_host, {"x-rapidapi-host": _host})
+    HTTP.rate_limit(_host, split_keys(_keys), int(os.getenv(f"{_prefix}_MONTHLY_BUDGET", RAPIDAPI_MONTHLY_BUDGET)))
+
+# --- Streaming JSON ---
+_WS = " \t\r\n"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+def iter_json_items(r, path=(), source="JSON"):
+    """Yield the elements of the JSON array at `path` one at a time.
+    
+    Reads the streamed response in chunks instead of building the whole
+    document, so peak memory is about one item. `path` is a tuple of
+    object keys leading to the array; () means the body itself is an
+    array. Sibling values along the path are skipped. Stopping iteration
+    early stops reading the body. A malformed or cut-off body raises, so
+    the caller can tell a partial read from a complete one.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = r.iter_content(chunk_size=65536)
+    state = {"buf": "", "pos": 0, "eof": False}
+    
+    def fill():
+        if state["eof"]:
+            return False
+        chunk = next(chunks, None)
+        # drop what has been consumed so the buffer stays small
+        state["buf"] = state["buf"][state["pos"]:]
+        state["pos"] = 0
+        if chunk is None:
+            state["eof"] = True
+            state["buf"] += utf8.decode(b"", final=True)
+        else:
+            state["buf"] += utf8.decode(chunk)
+        return True
+    
+    def peek():
+        while True:
+            buf, pos = state["buf"], state["pos"]
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            state["pos"] = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+    
+    def expect(chars):
+        c = peek()
+        if not c or c not in chars:
+            raise ValueError(f"expected one of {chars!r}, got {c!r}")
+        state["pos"] += 1
+        return c
+    
+    def value():
+        peek()
+        while True:
+            try:
+                buf = state["buf"]
+                obj, end = decoder.raw_decode(buf, state["pos"])
+                # A number cut at the buffer edge decodes short: "12" of "1234",
+                # or "3" of "3." when the chunk ends after the point
+                if state["eof"] or (end < len(buf) and buf[end] not in _NUMBER_CHARS):
+                    state["pos"] = end
+                    return obj
+            except json.JSONDecodeError:
+                if state["eof"]:
+                    raise
+            fill()
+    
+    try:
+        for key in path:
+            expect("{")
+            if peek() == "}":
+                return
+            while True:
+                name = value()
+                expect(":")
+                if name == key:
+                    break
+                value()
+                if expect(",}") == "}":
+                    return
+        if peek() != "[":
+            return
+        expect("[")
+        if peek() == "]":
+            return
+        while True:
+            yield value()
+            if expect(",]") == "]":
+                return
+    except (ValueError, requests.RequestException) as e:
+        raise ValueError(f"{source} stream error: {e}") from e
+    finally:
+        r.close()
+        HTTP.count_bytes(r)
 
 # --- Notification (Telegram) ---
 def notify_telegram(text):
@@ -100,1056 +1010,1717 @@ def notify_telegram(text):
     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
     payload = {"chat_id": TELEGRAM_CHAT_ID, "text": text, "disable_web_page_preview": True}
     try:
-        r = requests.post(url, json=payload, timeout=10)
+        r = HTTP.post(url, json=payload, timeout=10)
         r.raise_for_status()
     except Exception as e:
         print("Failed to send telegram:", e)
 
-# --- Utility: check recent (<= 1 hour) ---
-def is_recent_iso(timestr):
-    # Try parse common ISO formats
-    try:
-        # attempt RFC3339 / ISO format
-        dt = datetime.fromisoformat(timestr.replace("Z", "+00:00"))
-    except Exception:
-        try:
-            dt = datetime.strptime(timestr, "%a, %d %b %Y %H:%M:%S %Z")
-        except Exception:
-            return False
-    now = datetime.now(timezone.utc)
-    return (now - dt) <= timedelta(hours=1)
+# --- Deferred commits ---
+_commits = threading.local()
 
-def is_recent_epoch(epoch_seconds):
-    now = datetime.now(timezone.utc)
-    dt = datetime.fromtimestamp(epoch_seconds, tz=timezone.utc)
-    return (now - dt) <= timedelta(hours=1)
+def defer_commit(fn):
+    """Run fn once the calling fetcher's results have been handled.
+    
+    Cache validators and watermarks must not advance for a fetch that
+    failed or whose results were dropped (e.g. it missed the cycle
+    deadline). Outside the fetch stage fn runs immediately.
+    """
+    pending = getattr(_commits, "pending", None)
+    if pending is None:
+        fn()
+    else:
+        pending.append(fn)
 
-# --- Matching logic ---
-def match_keywords(text):
-    if not text:
-        return False
-    s = text.lower()
-    for kw in KEYWORDS:
-        if kw.lower() in s:
-            return True
-    return False
+def mark_fetch_failed():
+    # Tells the fetch stage (and the source's circuit breaker) this poll failed
+    _commits.failed = True
+
+def fetch_failed(source, e):
+    """Log a fetch error and return an empty result, counting it as a failure"""
+    print(f"{source} fetch error:", e)
+    # a deferral by the rate limiter or quota isn't the source's fault
+    if not isinstance(e, RateLimited):
+        mark_fetch_failed()
+    return []
 
-# --- Fetch RemoteOK ---
-def fetch_remoteok():
-    # RemoteOK returns JSON array
+def run_with_commits(fn):
+    """Call a fetcher, returning (jobs, deferred commits, whether it failed)"""
+    _commits.pending = []
+    _commits.failed = False
     try:
-        r = requests.get("https://remoteok.com/api", timeout=10, headers={"User-Agent": "job-bot/1.0"})
-        data = r.json()
-    except Exception as e:
-        print("RemoteOK fetch error:", e)
-        return []
+        return fn(), _commits.pending, _commits.failed
+    finally:
+        _commits.pending = None
 
-    jobs = []
-    for item in data:
-        # skip the first meta object if present
-        if isinstance(item, dict) and 'id' not in item:
-            continue
-        job_id = f"remoteok_{item.get('id')}"
-        # created_at sometimes as epoch or string - STRICT 24 hour limit
-        epoch = item.get('epoch')
-        is_recent = False
-        if epoch:
-            is_recent = is_recent_epoch(epoch)
+# --- Per-source watermarks ---
+class Watermark:
+    """Newest posting a source has processed, persisted in source_watermarks.
+    
+    Items posted before the cutoff are skipped. The cutoff trails the
+    watermark by WATERMARK_GRACE_MINUTES to catch postings the upstream
+    indexes late; after downtime it reaches back past the source's normal
+    window, up to WATERMARK_MAX_LOOKBACK_HOURS. Without a stored watermark
+    the source's own window applies.
+    """
+    
+    def __init__(self, source, window_seconds):
+        self.source = source
+        now = time.time()
+        row = STORE.get_watermark(source) if STORE is not None else None
+        if row and row[0]:
+            self.cutoff = max(row[0] - WATERMARK_GRACE_MINUTES * 60, now - WATERMARK_MAX_LOOKBACK_HOURS * 3600)
+            self.last_id = row[1]
         else:
-            created = item.get('date') or item.get('created_at')
-            if created:
-                is_recent = is_recent_iso(created)
-        if not is_recent:
-            continue
-        title = item.get('position') or item.get('title')
-        company = item.get('company')
-        tags = " ".join(item.get('tags', []))
-        desc = item.get('description') or ""
-        combined = " ".join(filter(None, [title, company, tags, desc]))
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "remoteok",
-                "title": title,
-                "company": company,
-                "url": item.get('url'),
-                "created_at": datetime.utcfromtimestamp(item.get('epoch')).isoformat() if item.get('epoch') else item.get('date'),
-                "raw": item
-            })
-    return jobs
-
-# --- Fetch JSearch Jobs ---
-def fetch_jsearch_jobs():
-    """Fetch jobs from JSearch API (RapidAPI)"""
-    if not JSEARCH_API_KEY:
-        print("JSearch API key not configured")
-        return []
+            self.cutoff = now - window_seconds
+            self.last_id = None
+        self.newest = row if row and row[0] else None
+        self.previous = self.newest[0] if self.newest else None
+    
+    def accepts(self, epoch, job_id=None):
+        """True if an item posted at epoch is newer than what was processed"""
+        if epoch is None:
+            return False
+        if self.newest is None or epoch > self.newest[0]:
+            self.newest = (epoch, job_id)
+        return epoch >= self.cutoff
+    
+    def is_new(self, epoch):
+        # Newer than anything an earlier poll processed, not just inside the grace window
+        return self.previous is None or epoch > self.previous
     
+    def reached(self, job_id):
+        # In a newest-first listing, the last processed ID means the rest is done
+        return self.last_id is not None and job_id == self.last_id
+    
+    def commit(self):
+        if self.newest and STORE is not None:
+            posted, job_id = self.newest
+            defer_commit(lambda: STORE.save_watermark(self.source, int(posted), job_id))
+
+# --- Conditional GET (ETag / Last-Modified) ---
+def cache_key(url, params=None):
+    return f"{url}?{urlencode(params)}" if params else url
+
+def get_validators(key):
+    if STORE is None:
+        return None, None
     try:
-        # JSearch API parameters
-        params = {
-            "query": "developer software engineer programmer remote",
-            "page": 1,
-            "num_pages": 1,
-            "country": "us",  # Focus on US
-            "date_posted": "today"  # Only today's jobs
-        }
-        
-        url = f"https://{JSEARCH_HOST}/search"
-        headers = {
-            'x-rapidapi-key': JSEARCH_API_KEY,
-            'x-rapidapi-host': JSEARCH_HOST
-        }
-        
-        r = requests.get(url, params=params, headers=headers, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("JSearch API fetch error:", e)
-        return []
+        return STORE.get_validators(key)
+    except sqlite3.Error:
+        return None, None
 
-    jobs = []
-    for item in data.get('data', []):
-        job_id = f"jsearch_{item.get('job_id')}"
-        
-        # Check if job is recent (within last 24 hours - STRICT)
-        posted_at = item.get('job_posted_at_datetime_utc')
-        if not posted_at:
-            continue
-            
-        # Parse the datetime and check if recent
-        try:
-            job_date = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
-            if (datetime.now(timezone.utc) - job_date) > timedelta(hours=24):
-                continue
-        except:
-            continue
-            
-        title = item.get('job_title')
-        company = item.get('employer_name')
-        description = item.get('job_description', "")
-        location = item.get('job_location', "")
-        is_remote = item.get('job_is_remote', False)
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, description, location]))
-        
-        # Additional filtering for remote jobs if REMOTE_ONLY is set
-        if REMOTE_ONLY == "1" and not is_remote:
-            continue
-            
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "jsearch",
-                "title": title,
-                "company": company,
-                "url": item.get('job_apply_link'),
-                "created_at": posted_at,
-                "location": location,
-                "is_remote": is_remote,
-                "salary_min": item.get('job_min_salary'),
-                "salary_max": item.get('job_max_salary'),
-                "employment_type": item.get('job_employment_type_text'),
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch Active Jobs ---
-def fetch_active_jobs():
-    """Fetch jobs from Active Jobs API (RapidAPI)"""
-    if not ACTIVE_JOBS_API_KEY:
-        print("Active Jobs API key not configured")
-        return []
+def save_validators(key, etag, last_modified):
+    if STORE is None or (not etag and not last_modified):
+        return
+    STORE.save_validators(key, etag, last_modified)
+
+def conditional_get(url, params=None, **kwargs):
+    """GET with If-None-Match/If-Modified-Since from the validator cache.
     
-    try:
-        # Active Jobs API parameters - using hourly endpoint with better filtering
-        url = f"https://{ACTIVE_JOBS_HOST}/active-ats-1h"
-        params = {
-            "offset": 0,
-            "title_filter": "developer OR engineer OR programmer OR software",
-            "location_filter": "United States OR Canada OR Remote OR US OR America",
-            "description_type": "text"
-        }
-        headers = {
-            'x-rapidapi-key': ACTIVE_JOBS_API_KEY,
-            'x-rapidapi-host': ACTIVE_JOBS_HOST
-        }
-        
-        r = requests.get(url, params=params, headers=headers, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("Active Jobs API fetch error:", e)
-        return []
+    A 304 response means nothing changed since the last successful poll,
+    so callers can skip parsing and matching entirely.
+    """
+    etag, last_modified = get_validators(cache_key(url, params))
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return HTTP.get(url, params=params, headers=headers, **kwargs)
 
-    jobs = []
-    for item in data:
-        if not isinstance(item, dict):
-            continue
-            
-        job_id = f"active_{item.get('id')}"
-        
-        # Check if job is recent (within last hour)
-        posted_at = item.get('date_posted')
-        if not posted_at:
-            continue
-            
-        # Parse the datetime and check if recent
+def remember_validators(url, r, params=None):
+    # Only store once the body has been processed, so a crash mid-parse
+    # doesn't turn the next poll into a 304 for unseen jobs
+    etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+    defer_commit(lambda: save_validators(cache_key(url, params), etag, last_modified))
+
+# --- Utility: timestamps ---
+def parse_epoch(value):
+    """Normalize a source timestamp (epoch s/ms, ISO 8601 or RFC 2822) to epoch seconds"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    if isinstance(value, (int, float)):
+        return int(value / 1000 if value > 1e12 else value)
+    if isinstance(value, datetime):
+        dt = value
+    else:
         try:
-            job_date = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
-            if (datetime.now(timezone.utc) - job_date) > timedelta(hours=1):
-                continue
-        except:
-            continue
-            
-        title = item.get('title')
-        company = item.get('organization')
-        location = item.get('locations_derived', [])
-        location_str = ', '.join(location) if location else ""
-        is_remote = item.get('remote_derived', False)
-        
-        # Parse salary if available
-        salary_raw = item.get('salary_raw')
-        salary_min = None
-        salary_max = None
-        if salary_raw and isinstance(salary_raw, str):
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
             try:
-                import json
-                salary_data = json.loads(salary_raw)
-                if 'value' in salary_data and 'minValue' in salary_data['value']:
-                    salary_min = salary_data['value']['minValue']
-                if 'value' in salary_data and 'maxValue' in salary_data['value']:
-                    salary_max = salary_data['value']['maxValue']
-            except:
-                pass
-        
-        # Get employment type
-        employment_type = item.get('employment_type', [])
-        employment_type_str = ', '.join(employment_type) if employment_type else ""
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, location_str]))
-        
-        # Additional filtering for remote jobs if REMOTE_ONLY is set
-        if REMOTE_ONLY == "1" and not is_remote:
-            continue
-            
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "active_jobs",
-                "title": title,
-                "company": company,
-                "url": item.get('url'),
-                "created_at": posted_at,
-                "location": location_str,
-                "is_remote": is_remote,
-                "salary_min": salary_min,
-                "salary_max": salary_max,
-                "employment_type": employment_type_str,
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch LinkedIn Jobs ---
-def fetch_linkedin_jobs():
-    """Fetch jobs from LinkedIn Jobs API (RapidAPI)"""
-    if not LINKEDIN_JOBS_API_KEY:
-        print("LinkedIn Jobs API key not configured")
-        return []
+                dt = parsedate_to_datetime(str(value))
+            except (TypeError, ValueError):
+                return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+# --- HTML to text ---
+# Script/style bodies, comments and tags become a space. Inline CSS and
+# data: images live inside tags and go with them. The pattern starts with
+# a literal "<" so the regex engine skips plain text without backtracking.
+# A "<" only opens a tag before a letter, "/", "!" or "?", so text such as
+# "salary <$120k ... > 3 years" is kept.
+_HTML_TAG_RE = re.compile(r"<(?:(script|style|head)\b.*?</\1\s*>|!--.*?-->|[A-Za-z/!?][^>]*>)", re.IGNORECASE | re.DOTALL)
+
+class TextCache:
+    """Bounded LRU of normalized descriptions keyed by a hash of the raw markup"""
     
-    try:
-        # LinkedIn Jobs API parameters - using 24h endpoint with proper filtering
-        url = f"https://{LINKEDIN_JOBS_HOST}/active-jb-24h"
-        params = {
-            "limit": 50,
-            "offset": 0,
-            "title_filter": "developer OR engineer OR programmer OR software",
-            "location_filter": "United States OR United Kingdom OR Canada OR Remote"
-        }
-        headers = {
-            'x-rapidapi-key': LINKEDIN_JOBS_API_KEY,
-            'x-rapidapi-host': LINKEDIN_JOBS_HOST
-        }
-        
-        r = requests.get(url, params=params, headers=headers, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("LinkedIn Jobs API fetch error:", e)
-        return []
+    def __init__(self, size=HTML_CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        with self.lock:
+            text = self.items.get(key)
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.items.move_to_end(key)
+            return text
+    
+    def put(self, key, text):
+        with self.lock:
+            self.items[key] = text
+            if len(self.items) > self.size:
+                self.items.popitem(last=False)
 
-    jobs = []
-    for item in data:
-        if not isinstance(item, dict):
-            continue
-            
-        job_id = f"linkedin_{item.get('id')}"
-        
-        # Check if job is recent (within last 24 hours - STRICT)
-        posted_at = item.get('date_posted')
-        if not posted_at:
-            continue
-            
-        # Parse the datetime and check if recent
-        try:
-            job_date = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
-            if (datetime.now(timezone.utc) - job_date) > timedelta(hours=24):
-                continue
-        except:
-            continue
-            
-        title = item.get('title')
-        company = item.get('organization')
-        location = item.get('locations_derived', [])
-        location_str = ', '.join(location) if location else ""
-        is_remote = item.get('remote_derived', False)
-        
-        # Parse salary if available
-        salary_raw = item.get('salary_raw')
-        salary_min = None
-        salary_max = None
-        if salary_raw and isinstance(salary_raw, dict):
-            try:
-                if 'value' in salary_raw and 'minValue' in salary_raw['value']:
-                    salary_min = salary_raw['value']['minValue']
-                if 'value' in salary_raw and 'maxValue' in salary_raw['value']:
-                    salary_max = salary_raw['value']['maxValue']
-            except:
-                pass
-        
-        # Get employment type
-        employment_type = item.get('employment_type', [])
-        employment_type_str = ', '.join(employment_type) if employment_type else ""
-        
-        # Get company details
-        company_size = item.get('linkedin_org_size', '')
-        company_industry = item.get('linkedin_org_industry', '')
-        company_employees = item.get('linkedin_org_employees', '')
-        
-        # Get recruiter info
-        recruiter_name = item.get('recruiter_name', '')
-        recruiter_title = item.get('recruiter_title', '')
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, location_str, company_industry]))
-        
-        # Additional filtering for remote jobs if REMOTE_ONLY is set
-        if REMOTE_ONLY == "1" and not is_remote:
-            continue
-            
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "linkedin",
-                "title": title,
-                "company": company,
-                "url": item.get('url'),
-                "created_at": posted_at,
-                "location": location_str,
-                "is_remote": is_remote,
-                "salary_min": salary_min,
-                "salary_max": salary_max,
-                "employment_type": employment_type_str,
-                "company_size": company_size,
-                "company_industry": company_industry,
-                "company_employees": company_employees,
-                "recruiter_name": recruiter_name,
-                "recruiter_title": recruiter_title,
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch Glassdoor Jobs ---
-def fetch_glassdoor_jobs():
-    """Fetch jobs from Glassdoor API (RapidAPI)"""
-    if not GLASSDOOR_API_KEY:
-        print("Glassdoor API key not configured")
-        return []
+HTML_CACHE = TextCache()
+
+def html_to_text(markup, limit=DESCRIPTION_MAX_CHARS):
+    """Plain text of an HTML fragment with whitespace collapsed, cut to limit.
     
-    try:
-        # Glassdoor API parameters - using job search endpoint
-        url = f"https://{GLASSDOOR_HOST}/jobs/search"
-        params = {
-            "query": "developer software engineer programmer remote",
-            "location": "United States"
-        }
-        headers = {
-            'x-rapidapi-key': GLASSDOOR_API_KEY,
-            'x-rapidapi-host': GLASSDOOR_HOST
-        }
-        
-        r = requests.get(url, params=params, headers=headers, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("Glassdoor API fetch error:", e)
-        return []
+    Results are cached by content hash, so a posting that stays in the
+    listing for a day is normalized once, not on every poll.
+    """
+    if not markup:
+        return ""
+    if not isinstance(markup, str):
+        markup = str(markup)
+    key = hashlib.blake2b(markup.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    text = HTML_CACHE.get(key)
+    if text is None:
+        if "<" in markup:
+            markup = _HTML_TAG_RE.sub(" ", markup)
+        # after the tags are gone, so "&lt;b&gt;" stays text
+        if "&" in markup:
+            markup = html.unescape(markup)
+        text = " ".join(markup.split())[:limit]
+        HTML_CACHE.put(key, text)
+    return text
 
-    jobs = []
-    # Parse the correct response structure
-    job_list = data.get('data', {}).get('jobListings', []) if isinstance(data.get('data'), dict) else []
+# --- Matching logic ---
+class KeywordMatcher:
+    """KEYWORDS lowercased once, each checked with a substring test.
     
-    for item in job_list:
-        if not isinstance(item, dict):
-            continue
-            
-        # Navigate the nested structure
-        jobview = item.get('jobview', {})
-        if not jobview:
-            continue
-            
-        job_data = jobview.get('job', {})
-        header_data = jobview.get('header', {})
-        
-        job_id = f"glassdoor_{job_data.get('listingId', '')}"
-        
-        # Check if job is recent (within last 24 hours - STRICT)
-        age_in_days = header_data.get('ageInDays', 999)
-        if age_in_days > 0:  # Only jobs from today (0 days old)
-            continue
-            
-        title = job_data.get('jobTitleText', '')
-        company = header_data.get('employerNameFromSearch', '')
-        location = header_data.get('locationName', '')
-        
-        # Get salary information
-        salary_min = None
-        salary_max = None
-        pay_data = header_data.get('payPeriodAdjustedPay', {})
-        if pay_data and isinstance(pay_data, dict):
-            salary_min = pay_data.get('p10')
-            salary_max = pay_data.get('p90')
-        
-        # Get job type from Indeed attributes
-        job_type = ""
-        indeed_attr = header_data.get('indeedJobAttribute', {})
-        if indeed_attr and isinstance(indeed_attr, dict):
-            extracted_attrs = indeed_attr.get('extractedJobAttributes', [])
-            if extracted_attrs:
-                job_type = extracted_attrs[0].get('value', '')
-        
-        # Get company rating
-        rating = header_data.get('rating', 0)
-        
-        # Get Easy Apply status
-        easy_apply = header_data.get('easyApply', False)
-        
-        # Get job view URL
-        job_view_url = header_data.get('jobViewUrl', '')
-        if job_view_url and not job_view_url.startswith('http'):
-            job_view_url = f"https://www.glassdoor.com{job_view_url}"
-        
-        # Get urgency signal (new jobs)
-        urgency = header_data.get('urgencySignal', {})
-        is_urgent = urgency.get('labelKey') == 'search-jobs.urgent-jobs.new' if urgency else False
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, location]))
-        
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "glassdoor",
-                "title": title,
-                "company": company,
-                "url": job_view_url,
-                "created_at": datetime.now(timezone.utc).isoformat(),  # Use current time since we filtered by age
-                "location": location,
-                "salary_min": salary_min,
-                "salary_max": salary_max,
-                "job_type": job_type,
-                "company_rating": rating,
-                "easy_apply": easy_apply,
-                "is_urgent": is_urgent,
-                "age_days": age_in_days,
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch Glassdoor Jobs Canada ---
-def fetch_glassdoor_jobs_canada():
-    """Fetch jobs from Glassdoor API for Canada (RapidAPI)"""
-    if not GLASSDOOR_API_KEY:
-        print("Glassdoor API key not configured")
-        return []
+    Short alphanumeric keywords (up to whole_word_max chars, e.g. "ai",
+    "api", "git", "rest") only match as whole words, so "maintain",
+    "rapid", "digital" and "interest" no longer count as hits.
+    """
     
-    try:
-        # Glassdoor API parameters - using job search endpoint for Canada
-        url = f"https://{GLASSDOOR_HOST}/jobs/search"
-        params = {
-            "query": "developer software engineer programmer remote",
-            "location": "Canada"
-        }
-        headers = {
-            'x-rapidapi-key': GLASSDOOR_API_KEY,
-            'x-rapidapi-host': GLASSDOOR_HOST
-        }
-        
-        r = requests.get(url, params=params, headers=headers, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("Glassdoor Canada API fetch error:", e)
-        return []
-
-    jobs = []
-    # Parse the correct response structure
-    job_list = data.get('data', {}).get('jobListings', []) if isinstance(data.get('data'), dict) else []
+    def __init__(self, keywords, whole_word_max=KEYWORD_WHOLE_WORD_MAX):
+        self.keywords = tuple(keywords)
+        self.words = list(dict.fromkeys(kw.lower() for kw in keywords if kw))
+        self.whole_word = {w for w in self.words if len(w) <= whole_word_max}
     
-    for item in job_list:
-        if not isinstance(item, dict):
-            continue
-            
-        # Navigate the nested structure
-        jobview = item.get('jobview', {})
-        if not jobview:
-            continue
-            
-        job_data = jobview.get('job', {})
-        header_data = jobview.get('header', {})
-        
-        job_id = f"glassdoor_ca_{job_data.get('listingId', '')}"
-        
-        # Check if job is recent (within last 24 hours - STRICT)
-        age_in_days = header_data.get('ageInDays', 999)
-        if age_in_days > 0:  # Only jobs from today (0 days old)
-            continue
-            
-        title = job_data.get('jobTitleText', '')
-        company = header_data.get('employerNameFromSearch', '')
-        location = header_data.get('locationName', '')
-        
-        # Get salary information
-        salary_min = None
-        salary_max = None
-        pay_data = header_data.get('payPeriodAdjustedPay', {})
-        if pay_data and isinstance(pay_data, dict):
-            salary_min = pay_data.get('p10')
-            salary_max = pay_data.get('p90')
-        
-        # Get job type from Indeed attributes
-        job_type = ""
-        indeed_attr = header_data.get('indeedJobAttribute', {})
-        if indeed_attr and isinstance(indeed_attr, dict):
-            extracted_attrs = indeed_attr.get('extractedJobAttributes', [])
-            if extracted_attrs:
-                job_type = extracted_attrs[0].get('value', '')
-        
-        # Get company rating
-        rating = header_data.get('rating', 0)
-        
-        # Get Easy Apply status
-        easy_apply = header_data.get('easyApply', False)
-        
-        # Get job view URL
-        job_view_url = header_data.get('jobViewUrl', '')
-        if job_view_url and not job_view_url.startswith('http'):
-            job_view_url = f"https://www.glassdoor.com{job_view_url}"
-        
-        # Get urgency signal (new jobs)
-        urgency = header_data.get('urgencySignal', {})
-        is_urgent = urgency.get('labelKey') == 'search-jobs.urgent-jobs.new' if urgency else False
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, location]))
-        
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "glassdoor_ca",
-                "title": title,
-                "company": company,
-                "url": job_view_url,
-                "created_at": datetime.now(timezone.utc).isoformat(),  # Use current time since we filtered by age
-                "location": location,
-                "salary_min": salary_min,
-                "salary_max": salary_max,
-                "job_type": job_type,
-                "company_rating": rating,
-                "easy_apply": easy_apply,
-                "is_urgent": is_urgent,
-                "age_days": age_in_days,
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch Indeed Jobs ---
-def fetch_indeed_jobs():
-    """Fetch jobs from Indeed API (RapidAPI)"""
-    if not INDEED_API_KEY:
-        print("Indeed API key not configured")
-        return []
+    @staticmethod
+    def _whole_word_in(word, s):
+        # Only alphanumeric edges need a boundary: "c#" may be followed by anything
+        check_before, check_after = word[0].isalnum(), word[-1].isalnum()
+        i = s.find(word)
+        while i != -1:
+            j = i + len(word)
+            if not (check_before and i and s[i - 1].isalnum()) and not (check_after and j < len(s) and s[j].isalnum()):
+                return True
+            i = s.find(word, i + 1)
+        return False
     
+    def find(self, text):
+        """Return every keyword found in text, in KEYWORDS order"""
+        if not text:
+            return []
+        s = text.lower()
+        return [w for w in self.words if w in s and (w not in self.whole_word or self._whole_word_in(w, s))]
+
+_matcher = None
+
+def get_matcher():
+    # Rebuilt only when KEYWORDS is edited at runtime
+    global _matcher
+    if _matcher is None or _matcher.keywords != tuple(KEYWORDS):
+        _matcher = KeywordMatcher(KEYWORDS)
+    return _matcher
+
+def match_keywords(text):
+    """Return the list of matched keywords (empty, so falsy, when none match)"""
+    return get_matcher().find(text)
+
+# --- Experience filter ---
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                 "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15}
+_YEARS_NUM = r"\d{1,2}|" + "|".join(_NUMBER_WORDS)
+
+# "5+ years", "minimum of 7 years", "3-5 yrs", "at least five years of experience".
+# A bare "10 years" only counts with a minimum, a plus or an "experience"
+# right after it. "over"/"more than" and ranges also need a requirement
+# word in the same sentence, so "for over 20 years, Acme has" doesn't count.
+_EXPERIENCE_RE = re.compile(
+    r"(?:\b(?:(?P<qual>minimum(?:\s+of)?|min\.?|at\s+least)|(?P<weak>over|more\s+than))\s+)?"
+    rf"\b(?P<low>{_YEARS_NUM})(?:\s*(?:-|–|to)\s*(?P<high>{_YEARS_NUM}))?"
+    r"\s*(?P<plus>\+|\s+or\s+more|\s+plus)?\s*(?:years?|yrs?)\b(?:'s?)?"
+    r"(?P<tail>(?:\s+of)?(?:\s+[\w/#+.-]+){0,4}?\s+(?:experience|exp)\b)?")
+
+# Minimum years a title's seniority implies
+SENIORITY_YEARS = {
+    "senior": 5, "sr": 5, "lead": 6, "staff": 8, "architect": 8, "principal": 10,
+    "director": 10, "head of": 10, "vp": 12, "vice president": 12, "chief": 12,
+}
+_REQUIREMENT_RE = re.compile(r"\b(?:requir\w*|must|need\w*|ideally|preferred|qualifications?|you have|you bring)\b")
+_SENTENCE_END = ".!?;\n"
+
+_SENIORITY_RE = re.compile(r"\b(" + "|".join(sorted(map(re.escape, SENIORITY_YEARS), key=len, reverse=True)) + r")\b")
+
+def years_required(text):
+    """Largest minimum years of experience a description asks for, or None.
+    
+    Only short windows around "year"/"yr" (found with str.find) go through
+    the regex, so long descriptions cost little more than lowercasing.
+    """
+    low = (text or "").lower()
+    best = None
+    for anchor in ("year", "yr"):
+        i = low.find(anchor)
+        while i != -1:
+            for m in _EXPERIENCE_RE.finditer(low, max(0, i - 40), i + 80):
+                if not (m.group("qual") or m.group("plus") or m.group("tail")):
+                    if not (m.group("weak") or m.group("high")) or not _asks_for(low, m.start(), m.end()):
+                        continue
+                years = _NUMBER_WORDS.get(m.group("low")) or int(m.group("low"))
+                # "30 years in business" is about the company, not the role
+                if years < 30 and (best is None or years > best):
+                    best = years
+            i = low.find(anchor, i + len(anchor))
+    return best
+
+def _asks_for(low, start, end):
+    """Whether the sentence around low[start:end] reads as a requirement"""
+    begin = max(low.rfind(c, max(0, start - 80), start) for c in _SENTENCE_END) + 1
+    stop = min((j for j in (low.find(c, end, end + 40) for c in _SENTENCE_END) if j != -1), default=end + 40)
+    return _REQUIREMENT_RE.search(low, max(begin, start - 80), stop) is not None
+
+def title_seniority(title):
+    """Minimum years the title's seniority implies (0 for none)"""
+    return max((SENIORITY_YEARS[m] for m in _SENIORITY_RE.findall((title or "").lower())), default=0)
+
+# --- Source adapters ---
+@dataclass
+class SourceAdapter:
+    """Declarative description of one job API (or feed format).
+    
+    parse turns one upstream item into Job fields plus "native_id" (or
+    "id_url"), "epoch", "text" (plain strings keyword matching runs on)
+    and "html" (description fields converted to text first), or None to
+    skip the item. The recency rule is a watermark over
+    window seconds; adapters with window=None filter by age in parse.
+    """
+    label: str
+    url: str
+    parse: object
+    params: dict = field(default_factory=dict)
+    items: tuple = ()              # JSON path of the item array
+    key: object = None             # returns the API key; None if no key is needed
+    load: object = None            # response -> items (default: streamed JSON at items)
+    window: int = 3600
+    newest_first: bool = False     # listing is sorted by date: stop at the watermark
+    page_param: str = None         # query param selecting the page; None if not paginated
+    page_step: int = 1             # added to page_param per page (the page size for offsets)
+    page_size: int = None          # items on a full page, when the API has a fixed size
+    query_param: str = None        # server-side keyword filter the planner fills from KEYWORDS
+    query_template: str = "{terms}"  # planned value; {base} is the param's default (the role filter)
+    query_replaces: str = None     # param the planned filter takes over from, dropped when planned
+    query_join: str = " OR "       # how the API combines alternatives
+    query_quote: str = '"'         # quotes phrases and terms with punctuation; "" for none
+    query_limit: int = 200         # longest query the API accepts, in characters
+    remote_params: dict = None     # extra params that ask the API for remote roles only
+    location: object = None        # COUNTRY code -> the API's location params
+    conditional: bool = False      # send ETag/Last-Modified validators
+    id_prefix: str = None          # job ID prefix when it differs from the source id
+    timeout: int = 15
+
+@dataclass
+class Source:
+    """One configured instance of an adapter, e.g. Glassdoor for Canada"""
+    name: str
+    adapter: SourceAdapter
+    source: str                    # Job.source and watermark key
+    params: dict = field(default_factory=dict)
+    
+    def endpoint(self):
+        """URL and query params; a "url" param replaces the adapter's URL and
+        {placeholders} in the URL are filled from params"""
+        location = self.adapter.location(country_code()) if self.adapter.location else {}
+        params = {**self.adapter.params, **location, **self.params}
+        url = params.pop("url", self.adapter.url)
+        for key in re.findall(r"{(\w+)}", url):
+            url = url.replace("{" + key + "}", str(params.pop(key, "")))
+        return url, params
+    
+    def plans(self):
+        """URL and the param sets to request, see plan_queries"""
+        url, params = self.endpoint()
+        return url, plan_queries(self.adapter, params, self.params)
+    
+    def fetch(self):
+        return fetch_source(self)
+
+# --- Query planning ---
+# Names for location filters that take a country name rather than a code
+COUNTRY_NAMES = {
+    "us": "United States", "ca": "Canada", "gb": "United Kingdom", "ie": "Ireland",
+    "au": "Australia", "nz": "New Zealand", "de": "Germany", "fr": "France", "nl": "Netherlands",
+    "es": "Spain", "it": "Italy", "pl": "Poland", "in": "India", "sg": "Singapore",
+    "br": "Brazil", "mx": "Mexico", "za": "South Africa",
+}
+
+def country_code():
+    """COUNTRY as an ISO 3166 code ("uk" is a common spelling of "gb")"""
+    code = COUNTRY.strip().lower()
+    return "gb" if code == "uk" else code
+
+def country_name(code):
+    return COUNTRY_NAMES.get(code, code.upper())
+
+def query_terms(quote='"'):
+    """KEYWORDS as search terms, without spelling variants a search engine treats alike"""
+    terms, keys = [], set()
+    for kw in KEYWORDS:
+        kw = kw.strip().lower()
+        # "full-stack" and "full stack" tokenize the same upstream
+        key = re.sub(r"[\s\-_]+", " ", kw)
+        if not kw or key in keys:
+            continue
+        keys.add(key)
+        terms.append(f"{quote}{kw}{quote}" if quote and not kw.isalnum() else kw)
+    return terms
+
+def pack_terms(terms, join, limit):
+    """Greedily pack terms into as few joined queries of at most limit characters"""
+    queries, current = [], ""
+    for term in terms:
+        candidate = f"{current}{join}{term}" if current else term
+        if len(candidate) <= limit:
+            current = candidate
+        else:
+            if current:
+                queries.append(current)
+            current = term[:limit]
+    if current:
+        queries.append(current)
+    return queries
+
+def plan_queries(adapter, params, overrides):
+    """Param sets that push KEYWORDS and REMOTE_ONLY into the API's own filters.
+    
+    The keywords narrow the adapter's role filter (query_template ANDs
+    them with it) rather than replace it, so "Scrum Master" stays out
+    upstream. The keyword part is split across several queries when the
+    whole exceeds the API's limit; if that would take more than
+    QUERY_MAX_SPLITS calls the adapter's broad default query is kept.
+    Params set explicitly on the source (SOURCE_CONFIG, EXTRA_SOURCES)
+    are never replaced.
+    """
+    base = dict(params)
+    if REMOTE_ONLY == "1" and adapter.remote_params:
+        base.update({k: v for k, v in adapter.remote_params.items() if k not in overrides})
+    if not adapter.query_param or adapter.query_param in overrides or adapter.query_replaces in overrides:
+        return [base]
+    frame = adapter.query_template.replace("{base}", str(base.get(adapter.query_param, "")))
+    limit = adapter.query_limit - len(frame.replace("{terms}", ""))
+    queries = pack_terms(query_terms(adapter.query_quote), adapter.query_join, limit)
+    if not queries or len(queries) > QUERY_MAX_SPLITS:
+        return [base]
+    planned = {k: v for k, v in base.items() if k != adapter.query_replaces}
+    return [{**planned, adapter.query_param: frame.replace("{terms}", query)} for query in queries]
+
+def load_json(r, src):
+    return iter_json_items(r, src.adapter.items, source=src.name)
+
+FEED_READ_SECONDS = 20             # total time allowed to download one feed body
+FEED_MAX_BYTES = 5 * 1024 * 1024   # feeds larger than this are cut off
+
+def read_body(r, seconds=FEED_READ_SECONDS, max_bytes=FEED_MAX_BYTES):
+    """Read a streamed body with a total time and size budget.
+    
+    The socket timeout only bounds each read, so a server trickling
+    bytes could otherwise hold the request open indefinitely.
+    """
+    deadline = time.monotonic() + seconds
+    chunks, size = [], 0
     try:
-        # Indeed API parameters - try simpler query first
-        url = f"https://{INDEED_HOST}/jobs/search"
-        params = {
-            "query": "developer",
-            "location": "United States",
-            "page_id": 1,
-            "locality": "us",
-            "fromage": 1,  # Last 1 day
-            "radius": 50,
-            "sort": "date"
-        }
-        headers = {
-            'x-rapidapi-key': INDEED_API_KEY,
-            'x-rapidapi-host': INDEED_HOST
-        }
+        for chunk in r.iter_content(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"body larger than {max_bytes} bytes")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"body not received within {seconds}s")
+    finally:
+        r.close()
+        HTTP.count_bytes(r)
+    return b"".join(chunks)
+
+def load_feed(r, src):
+    """Entries of an RSS/Atom body, parsed by feedparser from bytes we fetched
+    (feedparser fetching the URL itself has no timeout)"""
+    feed = feedparser.parse(read_body(r), response_headers={k.lower(): v for k, v in r.headers.items()})
+    if feed.bozo and not feed.entries:
+        raise feed.get('bozo_exception') or ValueError("unparseable feed")
+    return feed.entries
+
+def fetch_source(src):
+    """Fetch one source, apply its recency rule and match keywords.
+    
+    Each planned query is fetched page by page and the results merged.
+    The watermark only advances when every query was read completely.
+    Requests after the first only start while they can finish well inside
+    FETCH_DEADLINE_SECONDS; past that the source returns what it has.
+    """
+    adapter = src.adapter
+    url, plans = src.plans()
+    watermark = Watermark(src.source, adapter.window) if adapter.window else None
+    stop_at = time.monotonic() + FETCH_DEADLINE_SECONDS * 0.8 - adapter.timeout
+    found = {}
+    complete = True
+    calls = 0
+    try:
+        for i, params in enumerate(plans):
+            if i and time.monotonic() > stop_at:
+                print(f"{src.name}: Out of time, {len(plans) - i} of {len(plans)} queries left for the next poll")
+                complete = False
+                break
+            done, pages = fetch_pages(src, url, params, watermark, found, stop_at)
+            calls += pages
+            if done is None:
+                return []
+            complete = complete and done
+    finally:
+        observe_calls(src.name, calls)
+    if complete and watermark is not None:
+        watermark.commit()
+    return list(found.values())
+
+def fetch_pages(src, url, params, watermark, found, stop_at):
+    """Fetch one query page by page into found (job ID -> Job).
+    
+    Paginated adapters request the next page only while the last one held
+    postings newer than the watermark that aren't in seen_jobs, up to
+    PAGINATION_MAX_PAGES, so a quiet period still costs a single call,
+    and not after stop_at (time.monotonic()).
+    Returns (status, requests made): status is True when read completely,
+    False if a request failed or time ran out and None when the upstream
+    reported no changes (304).
+    """
+    adapter = src.adapter
+    params = dict(params)
+    for page in range(PAGINATION_MAX_PAGES if adapter.page_param else 1):
+        if page and time.monotonic() > stop_at:
+            # Same as a failed page: keep the matches, hold the watermark
+            print(f"{src.name}: Out of time after {page} pages")
+            return False, page
+        if page:
+            params[adapter.page_param] = int(params.get(adapter.page_param, 0)) + adapter.page_step
+        try:
+            get = conditional_get if adapter.conditional else HTTP.get
+            r = get(url, params=params or None, timeout=adapter.timeout, stream=True)
+            if r.status_code == 304 or not r.ok:
+                r.close()
+                if r.status_code == 304:
+                    return None, page + 1
+                r.raise_for_status()
+            items = (adapter.load or load_json)(r, src)
+        except Exception as e:
+            if not page:
+                fetch_failed(src.name, e)
+                return False, 1
+            # Keep what earlier pages found but leave the watermark where it
+            # was, so the next poll covers the pages we couldn't read
+            print(f"{src.name} page {page + 1} fetch error:", e)
+            return False, page + 1
         
-        r = requests.get(url, params=params, headers=headers, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("Indeed API fetch error:", e)
-        return []
+        try:
+            count, fresh, stopped = scan_page(src, items, watermark, found)
+        except Exception as e:
+            # Matches from before the error are kept; validators and the
+            # watermark stay put so the next poll reads the body again
+            fetch_failed(src.name, e)
+            return False, page + 1
+        if stopped or not count or (adapter.page_size and count < adapter.page_size):
+            break
+        if not fresh:
+            break
+    
+    if adapter.conditional:
+        remember_validators(url, r, params or None)
+    return True, page + 1
 
-    jobs = []
-    job_list = data.get('hits', [])
+# --- Filter pipeline ---
+class FilterStats:
+    """Items rejected and time spent per filter stage, reset every cycle.
     
-    for item in job_list:
-        if not isinstance(item, dict):
-            continue
+    Stages run cheapest first; "title" counts jobs accepted on the title
+    alone, which skips building the combined text for the "full" stage.
+    """
+    
+    STAGES = ("parse", "seen", "recency", "memo", "remote", "seniority", "title", "full", "experience")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.items = 0
+            self.matched = 0
+            self.counts = dict.fromkeys(self.STAGES, 0)
+            self.seconds = dict.fromkeys(self.STAGES, 0.0)
+    
+    def add(self, items, matched, counts, seconds):
+        with self.lock:
+            self.items += items
+            self.matched += matched
+            for stage in self.STAGES:
+                self.counts[stage] += counts[stage]
+                self.seconds[stage] += seconds[stage]
+    
+    def report(self):
+        with self.lock:
+            lines = [f"{self.items} items, {self.matched} matched"]
+            for stage in self.STAGES:
+                what = {"title": "matched early", "memo": "decided from memo"}.get(stage, "rejected")
+                lines.append(f"{stage}: {self.counts[stage]} {what}, {self.seconds[stage] * 1000:.1f} ms")
+        return lines
+
+FILTER_STATS = FilterStats()
+
+class DecisionMemo:
+    """Bounded LRU of item fingerprint -> filter decision, persisted in decision_memo.
+    
+    Only the content-based stages (remote, seniority, keywords,
+    experience) are memoized; seen and recency depend on time and are
+    always checked. The fingerprint covers the fields those stages read
+    plus the settings they use, so changing KEYWORDS or MAX_YEARS_EXP
+    starts from a clean slate. New decisions are written in one batch
+    per cycle; hits refresh their DB timestamp at most hourly.
+    """
+    
+    VERSION = 1  # bump when a memoized stage changes behaviour
+    TOUCH_SECONDS = 3600
+    
+    def __init__(self, size=DECISION_MEMO_SIZE):
+        self.size = size
+        self.items = OrderedDict()  # fingerprint -> (decision, used epoch)
+        self.dirty = {}
+        self.lock = threading.Lock()
+        self.salt = None
+        self.salted_for = None
+    
+    def _settings(self):
+        settings = [self.VERSION, sorted(KEYWORDS), KEYWORD_WHOLE_WORD_MAX, MAX_YEARS_EXP,
+                    REMOTE_ONLY, DESCRIPTION_MAX_CHARS, sorted(SENIORITY_YEARS.items())]
+        return hashlib.blake2b(json.dumps(settings).encode("utf-8"), digest_size=8).digest()
+    
+    def load(self, store):
+        rows = store.load_decisions(self.size)
+        with self.lock:
+            for fingerprint, decision, used in reversed(rows):
+                self.items[bytes(fingerprint)] = (decision, used)
+    
+    def fingerprint(self, row):
+        # Re-salted when KEYWORDS or a threshold is edited at runtime
+        current = (tuple(KEYWORDS), KEYWORD_WHOLE_WORD_MAX, MAX_YEARS_EXP, REMOTE_ONLY, DESCRIPTION_MAX_CHARS)
+        if self.salt is None or self.salted_for != current:
+            self.salt, self.salted_for = self._settings(), current
+        h = hashlib.blake2b(self.salt, digest_size=16)
+        for value in (row.get("title"), row.get("is_remote"), *row.get("text", ()), *row.get("html", ())):
+            h.update(str(value).encode("utf-8", "surrogatepass"))
+            h.update(b"\x1f")
+        return h.digest()
+    
+    def get(self, fingerprint):
+        with self.lock:
+            entry = self.items.get(fingerprint)
+            if entry is None:
+                return None
+            self.items.move_to_end(fingerprint)
+            decision, used = entry
+            now = int(time.time())
+            if now - used > self.TOUCH_SECONDS:
+                self.items[fingerprint] = (decision, now)
+                self.dirty[fingerprint] = (decision, now)
+            return decision
+    
+    def put(self, fingerprint, decision):
+        now = int(time.time())
+        with self.lock:
+            self.items[fingerprint] = (decision, now)
+            self.dirty[fingerprint] = (decision, now)
+            if len(self.items) > self.size:
+                self.items.popitem(last=False)
+    
+    def flush(self, store):
+        with self.lock:
+            rows = [(fingerprint, decision, used) for fingerprint, (decision, used) in self.dirty.items()]
+            self.dirty = {}
+        if rows and store is not None:
+            store.save_decisions(rows)
+
+MEMO = DecisionMemo()
+
+def combined_text(text, markup=()):
+    """Text for keyword and experience matching: plain fields plus normalized HTML ones"""
+    return " ".join(filter(None, [*text, *(html_to_text(m) for m in markup)]))
+
+# Items parsed before their IDs go to seen_jobs in one query; small, so a
+# streamed page never holds more than a handful of parsed items
+SCAN_BATCH = 50
+
+def scan_page(src, items, watermark, found):
+    """Run one page of items through the filter stages into found.
+    
+    Order: parse, seen, recency, memo, remote, title seniority, title
+    match, full-text match, years of experience (both against
+    MAX_YEARS_EXP). A memo hit decides the item without the later stages.
+    Items are parsed in batches of SCAN_BATCH whose IDs are looked up in
+    seen_jobs together. A date-sorted listing stops reading at the last
+    processed ID or the first item older than the watermark's cutoff.
+    Returns (items on the page, IDs of unseen postings newer than the
+    watermark, whether a date-sorted listing reached the watermark).
+    """
+    adapter = src.adapter
+    prefix = adapter.id_prefix or src.source
+    stop_at_watermark = watermark is not None and adapter.newest_first
+    clock = time.perf_counter
+    counts = dict.fromkeys(FilterStats.STAGES, 0)
+    seconds = dict.fromkeys(FilterStats.STAGES, 0.0)
+    count, matched, fresh = 0, 0, []
+    
+    def run_stages(batch):
+        nonlocal matched
+        started = clock()
+        seen_ids = STORE.seen_ids(job_id for _, _, job_id, _ in batch) if STORE is not None else set()
+        seconds["seen"] += clock() - started
+        
+        for raw, row, job_id, epoch in batch:
+            started = clock()
+            if job_id in found or job_id in seen_ids:
+                counts["seen"] += 1
+                continue
             
-        job_id = f"indeed_{item.get('id')}"
-        
-        # Check if job is recent (within last hour)
-        pub_date_ts = item.get('pub_date_ts_milli')
-        if not pub_date_ts:
-            continue
+            if watermark is not None:
+                accepted = epoch is not None and watermark.accepts(epoch, job_id)
+                now = clock()
+                seconds["recency"] += now - started
+                started = now
+                if not accepted:
+                    counts["recency"] += 1
+                    continue
+                if watermark.is_new(epoch):
+                    fresh.append(job_id)
+            else:
+                fresh.append(job_id)
             
-        # Convert timestamp to datetime and check if recent
-        try:
-            job_date = datetime.fromtimestamp(pub_date_ts / 1000, tz=timezone.utc)
-            if (datetime.now(timezone.utc) - job_date) > timedelta(hours=1):
+            fingerprint = MEMO.fingerprint(row)
+            decision = MEMO.get(fingerprint)
+            now = clock()
+            seconds["memo"] += now - started
+            started = now
+            if decision is not None:
+                counts["memo"] += 1
+                if decision != "match":
+                    continue
+                row.pop("text", None)
+                row.pop("html", None)
+                matched += 1
+                found[job_id] = Job(id=job_id, source=src.source, adapter=adapter.label, raw=raw, **row)
                 continue
-        except:
-            continue
             
-        title = item.get('title', '')
-        company = item.get('company_name', '')
-        location = item.get('location', '')
-        
-        # Get salary information
-        salary_data = item.get('salary', {})
-        salary_min = None
-        salary_max = None
-        salary_type = None
-        if salary_data and isinstance(salary_data, dict):
-            salary_min = salary_data.get('min')
-            salary_max = salary_data.get('max')
-            salary_type = salary_data.get('type', '')
-        
-        # Get relative time posted
-        relative_time = item.get('formatted_relative_time', '')
-        
-        # Get job link
-        job_link = item.get('link', '')
-        if job_link and not job_link.startswith('http'):
-            job_link = f"https://www.indeed.com{job_link}"
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, location]))
-        
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "indeed",
-                "title": title,
-                "company": company,
-                "url": job_link,
-                "created_at": job_date.isoformat(),
-                "location": location,
-                "salary_min": salary_min,
-                "salary_max": salary_max,
-                "salary_type": salary_type,
-                "relative_time": relative_time,
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch Authentic Jobs ---
-def fetch_authentic_jobs():
-    """Fetch jobs from Authentic Jobs API (no auth required)"""
+            # Sources that don't report remoteness leave is_remote as None
+            if REMOTE_ONLY == "1" and row.get("is_remote") is False:
+                counts["remote"] += 1
+                seconds["remote"] += clock() - started
+                MEMO.put(fingerprint, "remote")
+                continue
+            now = clock()
+            seconds["remote"] += now - started
+            started = now
+            
+            too_senior = title_seniority(row.get("title")) > MAX_YEARS_EXP
+            now = clock()
+            seconds["seniority"] += now - started
+            started = now
+            if too_senior:
+                counts["seniority"] += 1
+                MEMO.put(fingerprint, "seniority")
+                continue
+            
+            # A keyword in the title settles it without joining the description
+            text = row.pop("text")
+            markup = row.pop("html", ())
+            combined = None
+            hit = match_keywords(row.get("title") or "")
+            now = clock()
+            seconds["title"] += now - started
+            started = now
+            if hit:
+                counts["title"] += 1
+            else:
+                combined = combined_text(text, markup)
+                hit = match_keywords(combined)
+                now = clock()
+                seconds["full"] += now - started
+                started = now
+                if not hit:
+                    counts["full"] += 1
+                    MEMO.put(fingerprint, "full")
+                    continue
+            
+            if combined is None:
+                combined = combined_text(text, markup)
+            years = years_required(combined)
+            seconds["experience"] += clock() - started
+            if years is not None and years > MAX_YEARS_EXP:
+                counts["experience"] += 1
+                MEMO.put(fingerprint, "experience")
+                continue
+            MEMO.put(fingerprint, "match")
+            matched += 1
+            found[job_id] = Job(id=job_id, source=src.source, adapter=adapter.label, raw=raw, **row)
+    
+    batch, reached, error = [], False, None
+    try:
+        try:
+            for item in items:
+                count += 1
+                started = clock()
+                row = adapter.parse(item)
+                if row is None:
+                    counts["parse"] += 1
+                    seconds["parse"] += clock() - started
+                    continue
+                job_id = make_job_id(prefix, row.pop("native_id", None), row.pop("id_url", None) or row.get("url"),
+                                     row.get("title"), row.get("company"))
+                epoch = row.pop("epoch", None)
+                seconds["parse"] += clock() - started
+                # In a date-sorted listing everything after this is older: stop reading
+                if stop_at_watermark and (watermark.reached(job_id) or (epoch is not None and epoch < watermark.cutoff)):
+                    reached = True
+                    break
+                # The upstream item is only held on to when it will be kept
+                batch.append((pack_raw(item), row, job_id, epoch))
+                if len(batch) >= SCAN_BATCH:
+                    batch, full = [], batch
+                    run_stages(full)
+        except Exception as e:
+            # Filter what was read before the error, then report it
+            error = e
+        if batch:
+            run_stages(batch)
+        if error is not None:
+            raise error
+        return count, fresh, reached
+    finally:
+        FILTER_STATS.add(count, matched, counts, seconds)
+
+# --- Field extraction per API ---
+def parse_remoteok(item):
+    # skip the first meta object if present
+    if not isinstance(item, dict) or 'id' not in item:
+        return None
+    title = item.get('position') or item.get('title')
+    company = item.get('company')
+    return {
+        "native_id": item.get('id'),
+        # created_at sometimes as epoch or string
+        "epoch": parse_epoch(item.get('epoch') or item.get('date') or item.get('created_at')),
+        "text": [title, company, " ".join(item.get('tags', []))],
+        "html": [item.get('description')],
+        "title": title,
+        "company": company,
+        "url": item.get('url'),
+        "created_at": datetime.utcfromtimestamp(item.get('epoch')).isoformat() if item.get('epoch') else item.get('date'),
+    }
+
+def parse_jsearch(item):
+    if not isinstance(item, dict):
+        return None
+    title = item.get('job_title')
+    company = item.get('employer_name')
+    location = item.get('job_location', "")
+    return {
+        "native_id": item.get('job_id'),
+        "epoch": parse_epoch(item.get('job_posted_at_datetime_utc')),
+        "text": [title, company, location],
+        "html": [item.get('job_description')],
+        "title": title,
+        "company": company,
+        "url": item.get('job_apply_link'),
+        "created_at": item.get('job_posted_at_datetime_utc'),
+        "location": location,
+        "is_remote": item.get('job_is_remote', False),
+        "salary_min": item.get('job_min_salary'),
+        "salary_max": item.get('job_max_salary'),
+        "employment_type": item.get('job_employment_type_text'),
+    }
+
+def _ats_salary(salary_raw):
+    """(min, max) from a schema.org salary object (a JSON string on Active Jobs, a dict on LinkedIn)"""
     try:
-        # Authentic Jobs API
-        url = "https://authenticjobs.com/api/"
-        params = {
+        if isinstance(salary_raw, str):
+            salary_raw = json.loads(salary_raw)
+        value = salary_raw.get('value') or {}
+        return value.get('minValue'), value.get('maxValue')
+    except Exception:
+        return None, None
+
+def parse_active_jobs(item):
+    """Active Jobs and LinkedIn Jobs share the same ATS feed format"""
+    if not isinstance(item, dict):
+        return None
+    title = item.get('title')
+    company = item.get('organization')
+    location = ', '.join(item.get('locations_derived') or [])
+    salary_min, salary_max = _ats_salary(item.get('salary_raw'))
+    return {
+        "native_id": item.get('id'),
+        "epoch": parse_epoch(item.get('date_posted')),
+        "text": [title, company, location],
+        "title": title,
+        "company": company,
+        "url": item.get('url'),
+        "created_at": item.get('date_posted'),
+        "location": location,
+        "is_remote": item.get('remote_derived', False),
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "employment_type": ', '.join(item.get('employment_type') or []),
+    }
+
+def parse_linkedin(item):
+    row = parse_active_jobs(item)
+    if row is None:
+        return None
+    row["text"].append(item.get('linkedin_org_industry', ''))
+    row["extras"] = {
+        "company_size": item.get('linkedin_org_size', ''),
+        "company_industry": item.get('linkedin_org_industry', ''),
+        "company_employees": item.get('linkedin_org_employees', ''),
+        "recruiter_name": item.get('recruiter_name', ''),
+        "recruiter_title": item.get('recruiter_title', ''),
+    }
+    return row
+
+def parse_glassdoor(item):
+    jobview = item.get('jobview') if isinstance(item, dict) else None
+    if not jobview:
+        return None
+    job_data = jobview.get('job', {})
+    header_data = jobview.get('header', {})
+    
+    # Glassdoor only reports age in days: keep today's jobs (0 days old)
+    age_in_days = header_data.get('ageInDays', 999)
+    if age_in_days > 0:
+        return None
+    
+    title = job_data.get('jobTitleText', '')
+    company = header_data.get('employerNameFromSearch', '')
+    location = header_data.get('locationName', '')
+    
+    pay_data = header_data.get('payPeriodAdjustedPay') or {}
+    if not isinstance(pay_data, dict):
+        pay_data = {}
+    
+    # Get job type from Indeed attributes
+    job_type = ""
+    indeed_attr = header_data.get('indeedJobAttribute', {})
+    if indeed_attr and isinstance(indeed_attr, dict):
+        extracted_attrs = indeed_attr.get('extractedJobAttributes', [])
+        if extracted_attrs:
+            job_type = extracted_attrs[0].get('value', '')
+    
+    job_view_url = header_data.get('jobViewUrl', '')
+    if job_view_url and not job_view_url.startswith('http'):
+        job_view_url = f"https://www.glassdoor.com{job_view_url}"
+    
+    # Get urgency signal (new jobs)
+    urgency = header_data.get('urgencySignal', {})
+    return {
+        "native_id": job_data.get('listingId'),
+        "text": [title, company, location],
+        "title": title,
+        "company": company,
+        "url": job_view_url,
+        "created_at": datetime.now(timezone.utc).isoformat(),  # Use current time since we filtered by age
+        "location": location,
+        "salary_min": pay_data.get('p10'),
+        "salary_max": pay_data.get('p90'),
+        "extras": {
+            "job_type": job_type,
+            "company_rating": header_data.get('rating', 0),
+            "easy_apply": header_data.get('easyApply', False),
+            "is_urgent": urgency.get('labelKey') == 'search-jobs.urgent-jobs.new' if urgency else False,
+            "age_days": age_in_days,
+        },
+    }
+
+def parse_indeed(item):
+    if not isinstance(item, dict):
+        return None
+    epoch = parse_epoch(item.get('pub_date_ts_milli'))
+    if not epoch:
+        return None
+    title = item.get('title', '')
+    company = item.get('company_name', '')
+    location = item.get('location', '')
+    salary_data = item.get('salary') or {}
+    if not isinstance(salary_data, dict):
+        salary_data = {}
+    job_link = item.get('link', '')
+    if job_link and not job_link.startswith('http'):
+        job_link = f"https://www.indeed.com{job_link}"
+    return {
+        "native_id": item.get('id'),
+        "epoch": epoch,
+        "text": [title, company, location],
+        "title": title,
+        "company": company,
+        "url": job_link,
+        "created_at": datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat(),
+        "location": location,
+        "salary_min": salary_data.get('min'),
+        "salary_max": salary_data.get('max'),
+        "salary_type": salary_data.get('type', '') if salary_data else None,
+        "extras": {
+            "relative_time": item.get('formatted_relative_time', ''),
+        },
+    }
+
+def parse_authentic(item):
+    if not isinstance(item, dict):
+        return None
+    title = item.get('title')
+    company = item.get('company', {}).get('name', '')
+    location = item.get('location', "")
+    return {
+        "native_id": item.get('id'),
+        "epoch": parse_epoch(item.get('post_date')),
+        "text": [title, company, location],
+        "html": [item.get('description')],
+        "title": title,
+        "company": company,
+        "url": item.get('url'),
+        "created_at": item.get('post_date'),
+        "location": location,
+    }
+
+def parse_angellist(item):
+    if not isinstance(item, dict):
+        return None
+    title = item.get('title')
+    company = item.get('startup', {}).get('name', '')
+    location = item.get('location', "")
+    return {
+        "native_id": item.get('id'),
+        "epoch": parse_epoch(item.get('created_at')),
+        "text": [title, company, location],
+        "html": [item.get('description')],
+        "title": title,
+        "company": company,
+        "url": item.get('angellist_url'),
+        "created_at": item.get('created_at'),
+        "location": location,
+    }
+
+def parse_adzuna(item):
+    if not isinstance(item, dict):
+        return None
+    title = item.get("title")
+    company = item.get("company", {}).get("display_name")
+    return {
+        "native_id": item.get("id"),
+        "epoch": parse_epoch(item.get("created")),
+        "text": [title, company, item.get("category", {}).get("label", "")],
+        "html": [item.get("description")],
+        "title": title,
+        "company": company,
+        "url": item.get("redirect_url") or item.get("company", {}).get("url"),
+        "created_at": item.get("created"),
+    }
+
+def parse_feed_entry(entry):
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+    if not published:
+        return None
+    pub_date = datetime(*published[:6], tzinfo=timezone.utc)
+    title = entry.get('title', '')
+    company = entry.get('author', '')
+    return {
+        # Feeds have no numeric ID: prefer the entry's guid, else the canonical link
+        "id_url": entry.get('id') or entry.get('link'),
+        "epoch": int(pub_date.timestamp()),
+        "text": [title, company],
+        "html": [entry.get('summary')],
+        "title": title,
+        "company": company,
+        "url": entry.get('link'),
+        "created_at": pub_date.isoformat(),
+    }
+
+# --- Source registry ---
+ADAPTERS = {
+    "remoteok": SourceAdapter(
+        "RemoteOK", "https://remoteok.com/api", parse_remoteok,
+        newest_first=True, conditional=True, timeout=10),
+    "jsearch": SourceAdapter(
+        "JSearch API", f"https://{JSEARCH_HOST}/search", parse_jsearch,
+        params={
+            "query": "developer software engineer programmer remote",
+            "page": 1,
+            "num_pages": 1,
+            "date_posted": "today",  # Only today's jobs
+        },
+        location=lambda code: {"country": code},
+        items=('data',), key=lambda: JSEARCH_API_KEY, window=24 * 3600,
+        page_param="page", page_size=10,
+        # Google for Jobs caps queries at 32 words, about 200 characters of "a OR b"
+        query_param="query", query_template="{base} ({terms})", query_limit=200,
+        remote_params={"remote_jobs_only": "true"}),
+    "active_jobs": SourceAdapter(
+        "Active Jobs API", f"https://{ACTIVE_JOBS_HOST}/active-ats-1h", parse_active_jobs,
+        params={
+            "limit": 100,
+            "offset": 0,
+            "title_filter": "developer OR engineer OR programmer OR software",
+            "description_type": "text",
+        },
+        location=lambda code: {"location_filter": f"{country_name(code)} OR Remote"},
+        key=lambda: ACTIVE_JOBS_API_KEY, id_prefix="active",
+        page_param="offset", page_step=100, page_size=100,
+        # title_filter only ORs terms; the advanced filter takes the place
+        # of title_filter and can AND the keywords with the roles
+        query_param="advanced_title_filter", query_replaces="title_filter",
+        query_template="(developer | engineer | programmer | software) & ({terms})",
+        query_join=" | ", query_quote="'", query_limit=1000, remote_params={"remote": "true"}),
+    "linkedin": SourceAdapter(
+        "LinkedIn Jobs", f"https://{LINKEDIN_JOBS_HOST}/active-jb-24h", parse_linkedin,
+        params={
+            "limit": 50,
+            "offset": 0,
+            "title_filter": "developer OR engineer OR programmer OR software",
+        },
+        location=lambda code: {"location_filter": f"{country_name(code)} OR Remote"},
+        key=lambda: LINKEDIN_JOBS_API_KEY, window=24 * 3600,
+        page_param="offset", page_step=50, page_size=50,
+        query_param="advanced_title_filter", query_replaces="title_filter",
+        query_template="(developer | engineer | programmer | software) & ({terms})",
+        query_join=" | ", query_quote="'", query_limit=1000, remote_params={"remote": "true"}),
+    "glassdoor": SourceAdapter(
+        "Glassdoor Jobs", f"https://{GLASSDOOR_HOST}/jobs/search", parse_glassdoor,
+        params={
+            "query": "developer software engineer programmer remote",
+        },
+        location=lambda code: {"location": country_name(code)},
+        items=('data', 'jobListings'), key=lambda: GLASSDOOR_API_KEY, window=None,
+        query_param="query", query_template="{base} ({terms})", query_limit=200),
+    "indeed": SourceAdapter(
+        "Indeed Jobs", f"https://{INDEED_HOST}/jobs/search", parse_indeed,
+        params={
+            "query": "developer",
+            "page_id": 1,
+            "fromage": 1,  # Last 1 day
+            "radius": 50,
+            "sort": "date",
+        },
+        location=lambda code: {"location": country_name(code), "locality": code},
+        items=('hits',), key=lambda: INDEED_API_KEY, newest_first=True,
+        page_param="page_id", query_param="query", query_template="{base} ({terms})", query_limit=250),
+    "authentic": SourceAdapter(
+        "Authentic Jobs", "https://authenticjobs.com/api/", parse_authentic,
+        params={
             "method": "aj.jobs.search",
             "keywords": "developer,programmer,engineer",
             "perpage": 50,
-            "format": "json"
-        }
-        r = requests.get(url, params=params, timeout=10, headers={"User-Agent": "job-bot/1.0"})
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("Authentic Jobs fetch error:", e)
-        return []
+            "format": "json",
+        },
+        items=('listings', 'listing'), conditional=True, timeout=10),
+    "angellist": SourceAdapter(
+        "AngelList", "https://api.angel.co/1/jobs", parse_angellist,
+        params={"keywords": "developer,programmer,engineer", "remote": "true", "per_page": 50},
+        items=('jobs',), timeout=10),
+    "adzuna": SourceAdapter(
+        "Adzuna", "https://api.adzuna.com/v1/api/jobs/{country}/search/1", parse_adzuna,
+        params={
+            "app_id": ADZUNA_APP_ID,
+            "app_key": ADZUNA_APP_KEY,
+            "what": "software developer",
+            "results_per_page": 20,
+            "sort_by": "date",
+        },
+        location=lambda code: {"country": code},
+        items=('results',), key=lambda: ADZUNA_APP_ID and ADZUNA_APP_KEY, timeout=10,
+        # what_or matches any of its space-separated words; "what" then only narrows
+        query_param="what_or", query_join=" ", query_quote="", query_limit=1000),
+    "rss": SourceAdapter(
+        "RSS", None, parse_feed_entry,
+        load=load_feed, window=24 * 3600, conditional=True, timeout=10),
+}
 
-    jobs = []
-    for item in data.get('listings', {}).get('listing', []):
-        if not isinstance(item, dict):
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+def build_sources():
+    """Source instances from SOURCE_CONFIG, EXTRA_SOURCES and RSS_FEEDS"""
+    entries = list(SOURCE_CONFIG)
+    for spec in filter(None, (s.strip() for s in EXTRA_SOURCES.split(";"))):
+        adapter, _, query = spec.partition("?")
+        params = dict(parse_qsl(query))
+        label = ADAPTERS[adapter].label if adapter in ADAPTERS else adapter
+        suffix = ", ".join(params.values())
+        entries.append((adapter, f"{label} ({suffix})" if suffix else label,
+                        _slug(f"{adapter} {suffix}"), params))
+    for url in RSS_FEEDS:
+        host = urlsplit(url).hostname or url
+        entries.append(("rss", f"RSS ({host})", "rss_" + _slug(host), {"url": url}))
+    
+    sources, names = [], set()
+    for adapter, name, source, params in entries:
+        if adapter not in ADAPTERS:
+            print(f"{name}: Skipped (unknown source adapter '{adapter}')")
             continue
-            
-        job_id = f"authentic_{item.get('id')}"
-        
-        # Check if job is recent (within last hour)
-        created_at = item.get('post_date')
-        if not created_at or not is_recent_iso(created_at):
+        if name in names:
+            print(f"{name}: Skipped (configured twice)")
             continue
-            
-        title = item.get('title')
-        company = item.get('company', {}).get('name', '')
-        description = item.get('description', "")
-        location = item.get('location', "")
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, description, location]))
-        
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "authentic",
-                "title": title,
-                "company": company,
-                "url": item.get('url'),
-                "created_at": created_at,
-                "location": location,
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch Jobs from Remote.co ---
-def fetch_remote_co_jobs():
-    """Fetch jobs from Remote.co (scraping approach)"""
-    try:
-        # Remote.co doesn't have a public API, so we'll use a simple approach
-        # For now, let's return an empty list and focus on working APIs
-        print("Remote.co integration not implemented yet")
-        return []
-    except Exception as e:
-        print("Remote.co fetch error:", e)
-        return []
+        names.add(name)
+        sources.append(Source(name, ADAPTERS[adapter], source, params))
+    return sources
 
-# --- Fetch AngelList/Wellfound Jobs ---
-def fetch_angellist_jobs():
-    """Fetch jobs from AngelList/Wellfound (no auth required)"""
-    try:
-        # AngelList/Wellfound API - search for remote developer jobs
-        url = "https://api.angel.co/1/jobs"
-        params = {
-            "keywords": "developer,programmer,engineer",
-            "remote": "true",
-            "per_page": 50
-        }
-        r = requests.get(url, params=params, timeout=10, headers={"User-Agent": "job-bot/1.0"})
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("AngelList fetch error:", e)
-        return []
+# --- Cross-source duplicate detection ---
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+_COMPANY_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "gmbh", "plc", "limited", "the"}
+_TITLE_ALIASES = {"sr": "senior", "jr": "junior", "dev": "developer", "eng": "engineer", "swe": "software engineer"}
 
-    jobs = []
-    for item in data.get('jobs', []):
-        job_id = f"angellist_{item.get('id')}"
-        
-        # Check if job is recent (within last hour)
-        created_at = item.get('created_at')
-        if not created_at or not is_recent_iso(created_at):
-            continue
-            
-        title = item.get('title')
-        company = item.get('startup', {}).get('name', '')
-        description = item.get('description', "")
-        location = item.get('location', "")
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, description, location]))
-        
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "angellist",
-                "title": title,
-                "company": company,
-                "url": item.get('angellist_url'),
-                "created_at": created_at,
-                "location": location,
-                "raw": item
-            })
-    
-    return jobs
-
-# --- Fetch Stack Overflow Jobs ---
-def fetch_stackoverflow_jobs():
-    """Fetch jobs from Stack Overflow Jobs RSS feed"""
-    try:
-        # Stack Overflow Jobs RSS feed
-        rss_url = "https://stackoverflow.com/jobs/feed"
-        feed = feedparser.parse(rss_url)
-    except Exception as e:
-        print("Stack Overflow Jobs fetch error:", e)
-        return []
+def _tokens(text):
+    return _TOKEN_RE.findall((text or "").lower())
 
-    jobs = []
-    for entry in feed.entries:
-        # Extract job ID from the link
-        job_id = f"stackoverflow_{hash(entry.link) % 1000000}"
-        
-        # Check if job is recent (within last 24 hours - STRICT)
-        published = entry.get('published_parsed')
-        if not published:
-            continue
-            
-        # Convert to datetime and check if recent
-        pub_date = datetime(*published[:6], tzinfo=timezone.utc)
-        if (datetime.now(timezone.utc) - pub_date) > timedelta(hours=24):
+def posting_key(title, company, location=""):
+    """Normalized (title tokens, company, location parts) of a posting.
+    
+    Location parts are the comma-separated pieces ("austin", "tx", "us"),
+    most specific first; a location mentioning remote has none.
+    """
+    title_tokens = frozenset(" ".join(_TITLE_ALIASES.get(t, t) for t in _tokens(title)).split())
+    company_norm = " ".join(t for t in _tokens(company) if t not in _COMPANY_SUFFIXES)
+    parts = tuple(p for p in (" ".join(_tokens(part)) for part in (location or "").split(",")) if p)
+    if any("remote" in p.split() for p in parts):
+        parts = ()
+    return title_tokens, company_norm, parts
+
+def simhash(title_tokens, company_norm):
+    """64-bit SimHash over title tokens plus the company (weighted higher)"""
+    weights = [0] * 64
+    features = [(t, 1) for t in title_tokens]
+    if company_norm:
+        features.append(("c:" + company_norm, 3))
+    for feature, weight in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(64):
+            weights[bit] += weight if h >> bit & 1 else -weight
+    fp = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            fp |= 1 << bit
+    return fp
+
+class DuplicateIndex:
+    """Rolling window of recent postings for cross-source near-duplicate lookup.
+    
+    Fingerprints are split into 4 bands of 16 bits; two fingerprints
+    within Hamming distance 3 must share at least one band, so a lookup
+    only compares against postings in matching band buckets. Candidates
+    are then confirmed on title overlap, company and location. Postings
+    from the same source never merge: one board listing a role twice
+    means two openings (e.g. two offices), not a cross-post.
+    """
+    
+    BANDS = 4
+    MAX_DISTANCE = 3
+    
+    def __init__(self, window_seconds):
+        self.window = window_seconds
+        self.entries = {}  # job id -> (fingerprint, source, key)
+        self.buckets = [{} for _ in range(self.BANDS)]
+        self.order = deque()  # (added epoch, job id), oldest first
+    
+    def _bands(self, fp):
+        return [(fp >> (16 * i)) & 0xFFFF for i in range(self.BANDS)]
+    
+    def _expire(self, now):
+        while self.order and self.order[0][0] < now - self.window:
+            _, job_id = self.order.popleft()
+            entry = self.entries.pop(job_id, None)
+            if entry is None:
+                continue
+            for band, bucket in zip(self._bands(entry[0]), self.buckets):
+                ids = bucket.get(band)
+                if ids:
+                    ids.discard(job_id)
+                    if not ids:
+                        del bucket[band]
+    
+    @staticmethod
+    def _same_posting(a, b):
+        title_a, company_a, location_a = a
+        title_b, company_b, location_b = b
+        if not title_a or not title_b or company_a != company_b:
+            return False
+        if len(title_a & title_b) / len(title_a | title_b) < 0.75:
+            return False
+        # Locations only veto when both are known and neither side is
+        # remote. With a city on both sides the cities must match ("united
+        # states" alone doesn't make two offices one); a lone part such as
+        # "toronto" or "canada" must appear in the other location.
+        if not location_a or not location_b:
+            return True
+        if len(location_a) > 1 and len(location_b) > 1:
+            return location_a[0] == location_b[0]
+        if len(location_a) == 1:
+            return location_a[0] in location_b
+        return location_b[0] in location_a
+    
+    def find(self, source, title, company, location="", now=None):
+        """Return the id of a posting from another source this one duplicates, or None"""
+        self._expire(now or time.time())
+        key = posting_key(title, company, location)
+        fp = simhash(key[0], key[1])
+        candidates = set()
+        for band, bucket in zip(self._bands(fp), self.buckets):
+            candidates |= bucket.get(band, set())
+        for job_id in candidates:
+            other_fp, other_source, other_key = self.entries[job_id]
+            if other_source == source:
+                continue
+            if bin(fp ^ other_fp).count("1") <= self.MAX_DISTANCE and self._same_posting(key, other_key):
+                return job_id
+        return None
+    
+    def add(self, job_id, source, title, company, location="", added=None):
+        added = added or time.time()
+        key = posting_key(title, company, location)
+        fp = simhash(key[0], key[1])
+        self.entries[job_id] = (fp, source, key)
+        for band, bucket in zip(self._bands(fp), self.buckets):
+            bucket.setdefault(band, set()).add(job_id)
+        self.order.append((added, job_id))
+
+DUPES = DuplicateIndex(DUPLICATE_WINDOW_HOURS * 3600)
+
+# --- Notification formatting ---
+def format_job_message(job):
+    # Format the notification message
+    extras = job.extras
+    url_text = f"\n🔗 {job.url}" if job.url else ""
+    
+    # Same posting found on other boards this cycle
+    for copy in job.also_on:
+        url_text += f"\n🔗 {copy.source}: {copy.url}" if copy.url else f"\n🔗 Also on {copy.source}"
+    
+    # Add salary info if available (from JSearch)
+    salary_text = ""
+    if job.salary_min and job.salary_max:
+        salary_text = f"\n💰 Salary: ${job.salary_min:,} - ${job.salary_max:,}"
+    elif job.salary_min:
+        salary_text = f"\n💰 Salary: ${job.salary_min:,}+"
+    
+    # Add remote status if available
+    remote_text = ""
+    if job.is_remote is not None:
+        remote_text = f"\n🏠 Remote: {'Yes' if job.is_remote else 'No'}"
+    
+    # Add employment type if available
+    employment_text = ""
+    if job.employment_type:
+        employment_text = f"\n⏰ Type: {job.employment_type}"
+    
+    # Add LinkedIn-specific company details
+    company_details = ""
+    if job.adapter == ADAPTERS["linkedin"].label:
+        if extras.get('company_size'):
+            company_details += f"\n🏢 Company Size: {extras.get('company_size')}"
+        if extras.get('company_industry'):
+            company_details += f"\n🏭 Industry: {extras.get('company_industry')}"
+        if extras.get('company_employees'):
+            company_details += f"\n👥 Employees: {extras.get('company_employees')}"
+        if extras.get('recruiter_name'):
+            recruiter_text = f"Recruiter: {extras.get('recruiter_name')}"
+            if extras.get('recruiter_title'):
+                recruiter_text += f" ({extras.get('recruiter_title')})"
+            company_details += f"\n👤 {recruiter_text}"
+    
+    # Add Glassdoor-specific company details
+    elif job.adapter == ADAPTERS["glassdoor"].label:
+        if extras.get('company_rating') and extras.get('company_rating') > 0:
+            company_details += f"\n⭐ Company Rating: {extras.get('company_rating')}/5"
+        if extras.get('job_type'):
+            company_details += f"\n⏰ Job Type: {extras.get('job_type')}"
+        if extras.get('easy_apply'):
+            company_details += f"\n✅ Easy Apply: Yes"
+        if extras.get('is_urgent'):
+            company_details += f"\n🚨 Urgent: New Job"
+        if extras.get('age_days') is not None:
+            if extras.get('age_days') == 0:
+                company_details += f"\n📅 Posted: Today"
+            elif extras.get('age_days') == 1:
+                company_details += f"\n📅 Posted: Yesterday"
+            else:
+                company_details += f"\n📅 Posted: {extras.get('age_days')} days ago"
+        if job.source == 'glassdoor_ca':
+            company_details += f"\n🇨🇦 Location: Canada"
+    
+    # Add Indeed-specific details
+    elif job.adapter == ADAPTERS["indeed"].label:
+        if extras.get('relative_time'):
+            company_details += f"\n⏰ Posted: {extras.get('relative_time')}"
+        if job.salary_type:
+            company_details += f"\n💰 Pay Type: {job.salary_type}"
+    
+    return f"🔔 New job match!\n\n📋 {job.title}\n🏢 {job.company}\n📅 Posted: {job.created_at}\n🌐 Source: {job.source}{salary_text}{remote_text}{employment_text}{company_details}{url_text}"
+
+def collect_new_jobs(jobs, pending):
+    """Dedup a batch of matches and queue the new postings in pending.
+    
+    Jobs are checked against seen_jobs first, then against the duplicate
+    index: a copy of a posting queued this cycle is folded into that
+    notification, a copy of one notified earlier is dropped. Queued jobs
+    are only marked seen by send_notifications, so an error or restart
+    before then leaves them for the next poll.
+    """
+    seen = STORE.seen_ids(job.id for job in jobs)
+    fresh = {}
+    for job in jobs:
+        if job.id not in seen and job.id not in pending:
+            fresh.setdefault(job.id, job)
+    
+    new_jobs = 0
+    dropped = []
+    for job in fresh.values():
+        original = DUPES.find(job.source, job.title, job.company, job.location or "")
+        if original is None:
+            DUPES.add(job.id, job.source, job.title, job.company, job.location or "")
+            pending[job.id] = job
+            new_jobs += 1
+        elif original in pending:
+            pending[original].also_on.append(job)
+            print(f"🔁 {job.id} is the same posting as {original}")
+        else:
+            print(f"🔁 Skipping {job.id}: already notified as {original}")
+            dropped.append(job)
+    STORE.mark_seen_many(dropped)
+    return new_jobs
+
+def send_notifications(pending):
+    """Notify each pending job, then mark it and its copies seen.
+    
+    Returns the IDs whose message failed; they stay unseen so the next
+    poll tries them again.
+    """
+    failed = []
+    for job in pending.values():
+        try:
+            notify_telegram(format_job_message(job))
+            STORE.mark_seen_many([job, *job.also_on])
+        except Exception as e:
+            print(f"Failed to notify for {job.id}: {e}")
+            failed.append(job.id)
             continue
-            
-        title = entry.get('title', '')
-        company = entry.get('author', '')
-        description = entry.get('summary', '')
-        
-        # Combine all text for keyword matching
-        combined = " ".join(filter(None, [title, company, description]))
-        
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "stackoverflow",
-                "title": title,
-                "company": company,
-                "url": entry.get('link'),
-                "created_at": pub_date.isoformat(),
-                "raw": entry
-            })
-    
-    return jobs
-
-# --- Fetch Adzuna ---
-def fetch_adzuna():
-    if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
-        return []
-    params = {
-        "app_id": ADZUNA_APP_ID,
-        "app_key": ADZUNA_APP_KEY,
-        "what": "software developer",
-        "where": "United States",
-        "results_per_page": 20,
-        "sort_by": "date"
-    }
-    url = f"https://api.adzuna.com/v1/api/jobs/{COUNTRY}/search/1?{urlencode(params)}"
+        print(f"✅ Notified for: {job.id}")
+    return failed
+
+# --- Circuit breakers ---
+class CircuitBreaker:
+    """Stops polling a source after BREAKER_FAILURES consecutive failures.
+    
+    While open, the source is skipped until its next probe is due; each
+    failed probe doubles the wait (BREAKER_BASE_SECONDS up to
+    BREAKER_MAX_SECONDS) and a successful one closes the breaker. State
+    lives in source_breakers so dead endpoints stay parked across restarts.
+    """
+    
+    def __init__(self, name, failures=0, open_until=0.0, backoff=0.0):
+        self.name = name
+        self.failures = failures
+        self.open_until = open_until
+        self.backoff = backoff
+    
+    def allow(self, now):
+        return self.failures < BREAKER_FAILURES or now >= self.open_until
+    
+    def record(self, ok, now):
+        if ok:
+            if self.failures >= BREAKER_FAILURES:
+                print(f"🔌 {self.name}: circuit closed")
+            self.failures, self.open_until, self.backoff = 0, 0.0, 0.0
+        else:
+            self.failures += 1
+            if self.failures >= BREAKER_FAILURES:
+                self.backoff = min(BREAKER_MAX_SECONDS, self.backoff * 2 if self.backoff else BREAKER_BASE_SECONDS)
+                self.open_until = now + self.backoff
+                print(f"🔌 {self.name}: circuit open after {self.failures} failures, next probe in {self.backoff:.0f}s")
+        if STORE is not None:
+            STORE.save_breaker(self.name, self.failures, self.open_until, self.backoff)
+
+BREAKERS = {}
+
+def breaker_for(name):
+    breaker = BREAKERS.get(name)
+    if breaker is None:
+        row = STORE.get_breaker(name) if STORE is not None else None
+        breaker = BREAKERS[name] = CircuitBreaker(name, *row) if row else CircuitBreaker(name)
+    return breaker
+
+# --- Concurrent fetch stage ---
+SOURCES = build_sources()
+
+# Host behind each source and its calls per poll, for quota-based pacing of
+# RapidAPI sources. Calls start at one per planned query (a quiet poll) and
+# then follow what polls actually use, extra pages included.
+SOURCE_HOSTS = {src.name: urlsplit(src.endpoint()[0]).hostname for src in SOURCES}
+SOURCE_CALLS = {src.name: float(len(src.plans()[1])) for src in SOURCES}
+SOURCE_CALLS_ALPHA = 0.3  # EWMA weight of the latest poll
+
+def observe_calls(name, calls):
+    """Fold one poll's request count into SOURCE_CALLS"""
+    if name in SOURCE_CALLS:
+        SOURCE_CALLS[name] += SOURCE_CALLS_ALPHA * (calls - SOURCE_CALLS[name])
+
+def fetch_all_concurrently(sources, deadline, on_result, commits=None):
+    """Run every fetcher in parallel and hand each result to on_result as it arrives.
+    
+    Returns the names of sources that did not finish before the deadline.
+    Stragglers keep running in the background; their results are dropped.
+    A successful fetch's validator/watermark commits run once on_result
+    has handled it, or go into commits (name -> list) for the caller to
+    run once the jobs are notified.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="fetch")
+    futures = {pool.submit(run_with_commits, fn): name for name, fn in sources}
     try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-    except Exception as e:
-        print("Adzuna fetch error:", e)
-        return []
-    jobs = []
-    for item in data.get("results", []):
-        job_id = "adzuna_" + item.get("id", "")
-        created = item.get("created")  # ISO string
-        if not created or not is_recent_iso(created):
+        for future in as_completed(futures, timeout=deadline):
+            name = futures[future]
+            try:
+                jobs, source_commits, failed = future.result()
+            except Exception as e:
+                print(f"Error fetching {name}: {e}")
+                jobs, source_commits, failed = [], [], True
+            breaker_for(name).record(not failed, time.time())
+            try:
+                on_result(name, jobs)
+            except Exception as e:
+                # Nothing was handled, so nothing is committed: the next poll reads it again
+                print(f"Error handling {name} results: {e}")
+                continue
+            # validators/watermarks only advance once the results are handled,
+            # and never for a failed fetch
+            if failed:
+                continue
+            if commits is None:
+                for commit in source_commits:
+                    commit()
+            else:
+                commits[name] = source_commits
+    except FuturesTimeout:
+        pass
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    missed = [name for future, name in futures.items() if not future.done()]
+    for name in missed:
+        breaker_for(name).record(False, time.time())
+    return missed
+
+# --- Adaptive per-source scheduling ---
+class SourceScheduler:
+    """Independent timer per source, tuned to how often it yields new jobs.
+    
+    Each source keeps an EWMA of new postings per second and is polled
+    about once per expected new posting, clamped to
+    [SCHEDULER_MIN_SECONDS, SCHEDULER_MAX_SECONDS]. Due times advance from
+    the previous due time, not from when the poll finished, so intervals
+    don't drift with cycle length. Jitter keeps sources from lining up.
+    """
+    
+    ALPHA = 0.3  # EWMA weight of the latest poll
+    
+    def __init__(self, names, initial=POLL_SECONDS, min_seconds=SCHEDULER_MIN_SECONDS,
+                 max_seconds=SCHEDULER_MAX_SECONDS, jitter=SCHEDULER_JITTER, floor=None):
+        self.floor = floor or (lambda name: 0)
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.jitter = jitter
+        now = time.time()
+        self.interval = {name: self._clamp(initial) for name in names}
+        self.rate = {name: None for name in names}
+        self.last_run = {name: None for name in names}
+        self.next_due = {name: now for name in names}
+    
+    def _clamp(self, seconds):
+        return min(self.max_seconds, max(self.min_seconds, seconds))
+    
+    def due(self, now):
+        return [name for name, at in self.next_due.items() if at <= now]
+    
+    def record(self, name, new_jobs, now):
+        last = self.last_run[name]
+        self.last_run[name] = now
+        if last is not None:
+            observed = new_jobs / max(1.0, now - last)
+            prev = self.rate[name]
+            self.rate[name] = observed if prev is None else self.ALPHA * observed + (1 - self.ALPHA) * prev
+            rate = self.rate[name]
+            target = 1 / rate if rate > 0 else self.max_seconds
+            # back off at most 2x per poll so one quiet poll doesn't park a source
+            self.interval[name] = self._clamp(min(target, self.interval[name] * 2))
+        # a monthly quota budget can push a source past max_seconds
+        interval = max(self.interval[name], self.floor(name))
+        interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        due = self.next_due[name] + interval
+        # after an overrun, reschedule from now instead of firing a backlog
+        self.next_due[name] = due if due > now else now + interval
+    
+    def seconds_until_next(self, now):
+        return max(0.0, min(self.next_due.values()) - now) if self.next_due else POLL_SECONDS
+    
+    def describe(self):
+        return ", ".join(f"{name} {max(self.interval[name], self.floor(name)):.0f}s" for name in self.interval)
+
+def budget_floor(name):
+    """Minimum poll interval for a source so its host stays within the monthly budget"""
+    host = SOURCE_HOSTS.get(name)
+    if host not in HTTP.quota.keys:
+        return 0
+    calls = sum(SOURCE_CALLS[other] for other, other_host in SOURCE_HOSTS.items() if other_host == host)
+    return HTTP.quota.min_interval(host) * calls
+
+def configured_sources(verbose=True):
+    """SOURCES minus those whose API key is not configured"""
+    sources = []
+    for src in SOURCES:
+        if src.adapter.key is not None and not src.adapter.key():
+            if verbose:
+                print(f"{src.name}: Skipped (no API key configured)")
             continue
-        title = item.get("title")
-        company = item.get("company", {}).get("display_name")
-        desc = item.get("description", "")
-        combined = " ".join(filter(None, [title, company, desc, item.get("category", {}).get("label", "")]))
-        if match_keywords(combined):
-            jobs.append({
-                "id": job_id,
-                "source": "adzuna",
-                "title": title,
-                "company": company,
-                "url": item.get("redirect_url") or item.get("company", {}).get("url"),
-                "created_at": created,
-                "raw": item
-            })
-    return jobs
+        sources.append((src.name, src.fetch))
+    return sources
 
 # --- Main loop ---
-def check_and_notify():
+def check_and_notify(names=None):
+    """Poll the given sources (all configured ones by default).
+    
+    Returns the number of new postings per source name.
+    """
     print(f"[{datetime.now().isoformat()}] Checking for new jobs...")
+    started = time.monotonic()
+    FILTER_STATS.reset()
     
     # Check if Telegram is configured
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         print("⚠️  WARNING: Telegram not configured. Set TELEGRAM_TOKEN and TELEGRAM_CHAT_ID environment variables.")
         print("   Jobs will be found but notifications will not be sent.")
     
-    # Fetch from all sources
-    try:
-        remoteok_jobs = fetch_remoteok()
-        print(f"RemoteOK: Found {len(remoteok_jobs)} matching jobs")
-    except Exception as e:
-        print(f"Error fetching RemoteOK jobs: {e}")
-        remoteok_jobs = []
+    # Skip sources whose API key is not configured
+    sources = configured_sources(verbose=names is None)
+    if names is not None:
+        sources = [(name, fn) for name, fn in sources if name in names]
     
-    try:
-        jsearch_jobs = fetch_jsearch_jobs()
-        print(f"JSearch API: Found {len(jsearch_jobs)} matching jobs")
-    except Exception as e:
-        print(f"Error fetching JSearch jobs: {e}")
-        jsearch_jobs = []
+    # Skip sources whose circuit is open until their next probe
+    now = time.time()
+    for name, _ in sources:
+        breaker = breaker_for(name)
+        if not breaker.allow(now):
+            print(f"{name}: Skipped (circuit open, next probe in {breaker.open_until - now:.0f}s)")
+    sources = [(name, fn) for name, fn in sources if breaker_for(name).allow(now)]
     
-    # LinkedIn Jobs - Skip if API key not configured
-    if LINKEDIN_JOBS_API_KEY:
-        try:
-            linkedin_jobs = fetch_linkedin_jobs()
-            print(f"LinkedIn Jobs: Found {len(linkedin_jobs)} matching jobs")
-        except Exception as e:
-            print(f"Error fetching LinkedIn Jobs: {e}")
-            linkedin_jobs = []
-    else:
-        print("LinkedIn Jobs API: Skipped (no API key configured)")
-        linkedin_jobs = []
+    totals = {"found": 0, "new": 0}
+    per_source = {}
+    pending = {}
     
-    # Active Jobs - Skip if API key not configured
-    if ACTIVE_JOBS_API_KEY:
-        try:
-            active_jobs = fetch_active_jobs()
-            print(f"Active Jobs API: Found {len(active_jobs)} matching jobs")
-        except Exception as e:
-            print(f"Error fetching Active Jobs: {e}")
-            active_jobs = []
-    else:
-        print("Active Jobs API: Skipped (no API key configured)")
-        active_jobs = []
+    commits = {}
+    fetched_by = {}
     
-    # Indeed Jobs - Skip if API key not configured
-    if INDEED_API_KEY:
-        try:
-            indeed_jobs = fetch_indeed_jobs()
-            print(f"Indeed Jobs: Found {len(indeed_jobs)} matching jobs")
-        except Exception as e:
-            print(f"Error fetching Indeed Jobs: {e}")
-            indeed_jobs = []
-    else:
-        print("Indeed Jobs API: Skipped (no API key configured)")
-        indeed_jobs = []
+    def handle(name, jobs):
+        print(f"{name}: Found {len(jobs)} matching jobs")
+        totals["found"] += len(jobs)
+        per_source[name] = collect_new_jobs(jobs, pending)
+        totals["new"] += per_source[name]
+        fetched_by.update((job.id, name) for job in jobs)
     
-    try:
-        glassdoor_jobs = fetch_glassdoor_jobs()
-        print(f"Glassdoor Jobs (US): Found {len(glassdoor_jobs)} matching jobs")
-    except Exception as e:
-        print(f"Error fetching Glassdoor Jobs (US): {e}")
-        glassdoor_jobs = []
+    # Fetch from all sources in parallel; dedup each as soon as it lands
+    missed = fetch_all_concurrently(sources, FETCH_DEADLINE_SECONDS, handle, commits)
+    if missed:
+        print(f"⏱️  Missed the {FETCH_DEADLINE_SECONDS}s deadline: {', '.join(missed)}")
     
-    try:
-        glassdoor_ca_jobs = fetch_glassdoor_jobs_canada()
-        print(f"Glassdoor Jobs (CA): Found {len(glassdoor_ca_jobs)} matching jobs")
-    except Exception as e:
-        print(f"Error fetching Glassdoor Jobs (CA): {e}")
-        glassdoor_ca_jobs = []
+    # Sent once every source is in, so cross-source copies share one message
+    failed = send_notifications(pending)
     
+    # A source with an unsent job keeps its watermark and validators, so
+    # the job is fetched again next poll
+    held = {fetched_by[job_id] for job_id in failed}
+    for name, source_commits in commits.items():
+        if name not in held:
+            for commit in source_commits:
+                commit()
     try:
-        stackoverflow_jobs = fetch_stackoverflow_jobs()
-        print(f"Stack Overflow Jobs: Found {len(stackoverflow_jobs)} matching jobs")
-    except Exception as e:
-        print(f"Error fetching Stack Overflow Jobs: {e}")
-        stackoverflow_jobs = []
+        MEMO.flush(STORE)
+    except sqlite3.Error as e:
+        print("Decision memo flush error:", e)
     
-    adzuna_jobs = fetch_adzuna()
-    found = remoteok_jobs + jsearch_jobs + linkedin_jobs + active_jobs + indeed_jobs + glassdoor_jobs + glassdoor_ca_jobs + stackoverflow_jobs + adzuna_jobs
-    print(f"Total matches: {len(found)}")
-    
-    new_jobs = 0
-    for job in found:
-        if is_seen(job["id"]):
-            continue
-        
-        new_jobs += 1
-        # mark seen and notify
-        mark_seen(job["id"], job["source"], job.get("title"), job.get("company"), job.get("created_at"))
-        
-        # Format the notification message
-        url_text = f"\n🔗 {job.get('url')}" if job.get('url') else ""
-        
-        # Add salary info if available (from JSearch)
-        salary_text = ""
-        if job.get('salary_min') and job.get('salary_max'):
-            salary_text = f"\n💰 Salary: ${job.get('salary_min'):,} - ${job.get('salary_max'):,}"
-        elif job.get('salary_min'):
-            salary_text = f"\n💰 Salary: ${job.get('salary_min'):,}+"
-        
-        # Add remote status if available
-        remote_text = ""
-        if job.get('is_remote') is not None:
-            remote_text = f"\n🏠 Remote: {'Yes' if job.get('is_remote') else 'No'}"
-        
-        # Add employment type if available
-        employment_text = ""
-        if job.get('employment_type'):
-            employment_text = f"\n⏰ Type: {job.get('employment_type')}"
-        
-        # Add LinkedIn-specific company details
-        company_details = ""
-        if job.get('source') == 'linkedin':
-            if job.get('company_size'):
-                company_details += f"\n🏢 Company Size: {job.get('company_size')}"
-            if job.get('company_industry'):
-                company_details += f"\n🏭 Industry: {job.get('company_industry')}"
-            if job.get('company_employees'):
-                company_details += f"\n👥 Employees: {job.get('company_employees')}"
-            if job.get('recruiter_name'):
-                recruiter_text = f"Recruiter: {job.get('recruiter_name')}"
-                if job.get('recruiter_title'):
-                    recruiter_text += f" ({job.get('recruiter_title')})"
-                company_details += f"\n👤 {recruiter_text}"
-        
-        # Add Glassdoor-specific company details
-        elif job.get('source') in ['glassdoor', 'glassdoor_ca']:
-            if job.get('company_rating') and job.get('company_rating') > 0:
-                company_details += f"\n⭐ Company Rating: {job.get('company_rating')}/5"
-            if job.get('job_type'):
-                company_details += f"\n⏰ Job Type: {job.get('job_type')}"
-            if job.get('easy_apply'):
-                company_details += f"\n✅ Easy Apply: Yes"
-            if job.get('is_urgent'):
-                company_details += f"\n🚨 Urgent: New Job"
-            if job.get('age_days') is not None:
-                if job.get('age_days') == 0:
-                    company_details += f"\n📅 Posted: Today"
-                elif job.get('age_days') == 1:
-                    company_details += f"\n📅 Posted: Yesterday"
-                else:
-                    company_details += f"\n📅 Posted: {job.get('age_days')} days ago"
-            if job.get('source') == 'glassdoor_ca':
-                company_details += f"\n🇨🇦 Location: Canada"
-        
-        # Add Indeed-specific details
-        elif job.get('source') == 'indeed':
-            if job.get('relative_time'):
-                company_details += f"\n⏰ Posted: {job.get('relative_time')}"
-            if job.get('salary_type'):
-                company_details += f"\n💰 Pay Type: {job.get('salary_type')}"
-        
-        text = f"🔔 New job match!\n\n📋 {job.get('title')}\n🏢 {job.get('company')}\n📅 Posted: {job.get('created_at')}\n🌐 Source: {job.get('source')}{salary_text}{remote_text}{employment_text}{company_details}{url_text}"
-        
-        notify_telegram(text)
-        print(f"✅ Notified for: {job['id']}")
-    
-    if new_jobs == 0:
+    print(f"Total matches: {totals['found']} ({time.monotonic() - started:.1f}s)")
+    http = HTTP.stats()
+    print(f"HTTP: {http['requests']} requests, {http['bytes'] / 1024:.0f} KB, {http['reused']} reused / {http['connections']} opened connections, {HTTP.hedges_won}/{HTTP.hedges_sent} hedges won")
+    for line in FILTER_STATS.report():
+        print(f"Filter {line}")
+    print(f"Description cache: {len(HTML_CACHE.items)} entries, {HTML_CACHE.hits} hits / {HTML_CACHE.misses} misses")
+    for line in HTTP.latency.report():
+        print(f"Latency {line}")
+    for line in HTTP.quota.report():
+        print(f"Quota {line}")
+    for name, quota in HTTP.limiter.allowance().items():
+        if quota["remaining"] is not None or quota["blocked_for"]:
+            print(f"Rate limit {name}: {quota['remaining']}/{quota['limit']} left, resets in {quota['reset_in']}s, blocked {quota['blocked_for']}s")
+    if totals["new"] == 0:
         print("No new jobs found this round.")
     else:
-        print(f"🎉 Found {new_jobs} new job(s)!")
+        print(f"🎉 Found {totals['new']} new job(s)!")
+    return per_source
 
 if __name__ == "__main__":
     init_db()
-    # simple loop; run forever in the container
+    STORE.start_retention()
+    scheduler = SourceScheduler([name for name, _ in configured_sources()], floor=budget_floor)
+    # run forever in the container; each source on its own timer
     while True:
-        try:
-            check_and_notify()
-        except Exception as e:
-            print("Main loop error:", e)
-        time.sleep(POLL_SECONDS)
+        names = scheduler.due(time.time())
+        if names:
+            try:
+                per_source = check_and_notify(names)
+            except Exception as e:
+                print("Main loop error:", e)
+                per_source = {}
+            now = time.time()
+            for name in names:
+                scheduler.record(name, per_source.get(name, 0), now)
+            print(f"Poll intervals: {scheduler.describe()}")
+        time.sleep(scheduler.seconds_until_next(time.time()))
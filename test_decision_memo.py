@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the filter decision memo
+"""
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class DecisionMemoTest(unittest.TestCase):
+
+    row = {"title": "React Developer", "is_remote": True, "text": ["React Developer"], "html": ["<p>5+ years</p>"]}
+
+    def test_same_content_same_fingerprint(self):
+        memo = main.DecisionMemo()
+        self.assertEqual(memo.fingerprint(dict(self.row)), memo.fingerprint(dict(self.row)))
+
+    def test_runtime_setting_changes_change_the_fingerprint(self):
+        memo = main.DecisionMemo()
+        before = memo.fingerprint(self.row)
+        with mock.patch.object(main, "KEYWORDS", main.KEYWORDS + ["rust"]):
+            with_keyword = memo.fingerprint(self.row)
+        with mock.patch.object(main, "MAX_YEARS_EXP", main.MAX_YEARS_EXP + 1):
+            with_years = memo.fingerprint(self.row)
+        self.assertEqual(len({before, with_keyword, with_years}), 3)
+        self.assertEqual(memo.fingerprint(self.row), before)
+
+    def test_keyword_list_edited_in_place(self):
+        memo = main.DecisionMemo()
+        keywords = list(main.KEYWORDS)
+        with mock.patch.object(main, "KEYWORDS", keywords):
+            before = memo.fingerprint(self.row)
+            keywords.append("rust")
+            self.assertNotEqual(memo.fingerprint(self.row), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for cross-source near-duplicate detection
+"""
+import os
+import unittest
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class DuplicateIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = main.DuplicateIndex(3600)
+        self.index.add("a", "linkedin", "Senior React Developer", "Acme Inc.", "Austin, TX, United States")
+
+    def test_cross_post_merges(self):
+        self.assertEqual(self.index.find("jsearch", "Sr React Developer", "Acme", "Austin, Texas, United States"), "a")
+        self.assertEqual(self.index.find("jsearch", "Senior React Developer", "Acme", "Austin"), "a")
+        self.assertEqual(self.index.find("jsearch", "Senior React Developer", "Acme", "Remote"), "a")
+        self.assertEqual(self.index.find("jsearch", "Senior React Developer", "Acme", ""), "a")
+
+    def test_same_source_never_merges(self):
+        self.assertIsNone(self.index.find("linkedin", "Senior React Developer", "Acme", "Austin, TX, United States"))
+
+    def test_other_city_in_same_country_is_not_a_duplicate(self):
+        self.assertIsNone(self.index.find("jsearch", "Senior React Developer", "Acme", "Boston, MA, United States"))
+        self.assertIsNone(self.index.find("jsearch", "Senior React Developer", "Acme", "Denver"))
+
+
+class WarmFromStoreTest(unittest.TestCase):
+
+    def test_recent_postings_keep_location_and_skip_legacy_rows(self):
+        store = main.SeenStore(":memory:")
+        store.mark_seen_many([main.Job("j1", "linkedin", "React Developer", "Acme", created_at="2026-10-17T10:00:00Z", location="Austin, TX")])
+        with store.conn:
+            store.conn.execute("INSERT INTO seen_jobs (id, source, title, company, created_epoch) VALUES ('old', 'x', 't', 'c', ?)",
+                               (int(main.time.time()),))
+        rows = store.recent_postings(0)
+        self.assertEqual([(r[0], r[1], r[4]) for r in rows], [("j1", "linkedin", "Austin, TX")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the experience extractor behind MAX_YEARS_EXP
+"""
+import os
+import unittest
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class YearsRequiredTest(unittest.TestCase):
+
+    def test_requirements(self):
+        cases = {
+            "5+ years of React": 5,
+            "minimum of 7 years": 7,
+            "3-5 yrs of experience": 3,
+            "at least five years of experience": 5,
+            "Requirements: over 6 years building APIs": 6,
+            "3-5 years in a similar role required.": 3,
+            "You must have more than 8 years writing Python": 8,
+        }
+        for text, years in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(main.years_required(text), years)
+
+    def test_company_boilerplate_is_ignored(self):
+        for text in (
+            "For over 20 years, Acme has built software. We need a React developer.",
+            "Acme has been hiring engineers for more than 10 years.",
+            "Acme was founded over 25 years ago.",
+            "We work in 2-3 year cycles.",
+            "Requirements:\nFor over 20 years, Acme has grown.",
+        ):
+            with self.subTest(text=text):
+                self.assertIsNone(main.years_required(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
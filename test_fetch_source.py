@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests for fetching a source: pagination, watermarks, 304s and the time budget
+"""
+import json
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class FakeResponse:
+    """Just enough of requests.Response for fetch_pages"""
+
+    def __init__(self, body=b"", status_code=200, headers=None):
+        self.body = json.dumps(body).encode("utf-8") if not isinstance(body, bytes) else body
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.raw = None
+        self._content = b""
+
+    def iter_content(self, chunk_size=None):
+        yield self.body
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise main.requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeApi:
+    """Offset-paginated listing of React jobs, newest first, one minute apart"""
+
+    def __init__(self, total, page_size=10, now=100000, statuses=None):
+        self.total = total
+        self.page_size = page_size
+        self.now = now
+        self.statuses = statuses or {}
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        params = dict(params or {})
+        self.requests.append(params)
+        offset = int(params.get("offset", 0))
+        status = self.statuses.get(offset)
+        if status:
+            return FakeResponse(status_code=status)
+        items = [{"id": i, "title": "React Developer", "epoch": self.now - 60 * i}
+                 for i in range(offset, min(offset + self.page_size, self.total))]
+        return FakeResponse({"data": items}, headers={"ETag": f'"v{offset}"'})
+
+
+def parse(item):
+    return {"native_id": item["id"], "epoch": item["epoch"], "title": item["title"], "company": "Acme",
+            "text": [item["title"]], "html": []}
+
+
+class FetchSourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = main.SeenStore(":memory:")
+        self.api = FakeApi(total=35)
+        for target, name, value in ((main, "STORE", self.store), (main.HTTP, "get", self.api.get),
+                                    (main.time, "time", lambda: self.api.now + 60)):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        main.SOURCE_CALLS.pop("Test", None)
+
+    def source(self, **fields):
+        fields = {"items": ("data",), "window": 3600, "page_param": "offset", "page_step": 10,
+                  "page_size": 10, "conditional": True, **fields}
+        return main.Source("Test", main.SourceAdapter("Test", "http://localhost/jobs", parse, **fields), "test")
+
+    def test_observed_calls_per_poll_drive_the_budget_floor(self):
+        main.SOURCE_CALLS["Test"] = 1.0
+        self.addCleanup(main.SOURCE_CALLS.pop, "Test", None)
+        main.fetch_source(self.source())
+        self.assertEqual(len(self.api.requests), 4)
+        self.assertAlmostEqual(main.SOURCE_CALLS["Test"], 1.0 + main.SOURCE_CALLS_ALPHA * 3)
+
+    def fetch(self, src):
+        """fetch_source inside the fetch stage, committing like a successful cycle"""
+        jobs, commits, failed = main.run_with_commits(src.fetch)
+        if not failed:
+            for commit in commits:
+                commit()
+        return jobs, failed
+
+    def test_pages_until_a_short_page_then_advances_watermark_and_validators(self):
+        jobs, failed = self.fetch(self.source())
+        self.assertFalse(failed)
+        self.assertEqual([r.get("offset", 0) for r in self.api.requests], [0, 10, 20, 30])
+        self.assertEqual(len(jobs), 35)
+        self.assertEqual(self.store.get_watermark("test"), (self.api.now, "test_0"))
+        self.assertIsNotNone(self.store.conn.execute("SELECT etag FROM http_validators").fetchone())
+
+    def test_stops_after_a_page_with_nothing_fresh(self):
+        self.store.mark_seen_many([main.Job(f"test_{i}", "test") for i in range(10)])
+        jobs, _ = self.fetch(self.source())
+        self.assertEqual(len(self.api.requests), 1)
+        self.assertEqual(jobs, [])
+
+    def test_not_modified_keeps_state(self):
+        self.api.statuses = {0: 304}
+        jobs, failed = self.fetch(self.source())
+        self.assertEqual((jobs, failed), ([], False))
+        self.assertEqual(len(self.api.requests), 1)
+        self.assertIsNone(self.store.get_watermark("test"))
+
+    def test_failed_follow_up_page_keeps_matches_but_not_the_watermark(self):
+        self.api.statuses = {20: 500}
+        jobs, failed = self.fetch(self.source())
+        self.assertFalse(failed)
+        self.assertEqual(len(jobs), 20)
+        self.assertIsNone(self.store.get_watermark("test"))
+        self.assertIsNone(self.store.conn.execute("SELECT etag FROM http_validators").fetchone())
+
+    def test_failed_first_page_fails_the_fetch(self):
+        self.api.statuses = {0: 500}
+        jobs, failed = self.fetch(self.source())
+        self.assertEqual((jobs, failed), ([], True))
+        self.assertIsNone(self.store.get_watermark("test"))
+
+    def test_out_of_time_stops_paginating_and_keeps_the_watermark(self):
+        with mock.patch.object(main, "FETCH_DEADLINE_SECONDS", 0):
+            jobs, failed = self.fetch(self.source())
+        self.assertFalse(failed)
+        self.assertEqual(len(self.api.requests), 1)
+        self.assertEqual(len(jobs), 10)
+        self.assertIsNone(self.store.get_watermark("test"))
+
+    def test_out_of_time_skips_later_queries(self):
+        src = self.source()
+        with mock.patch.object(main, "plan_queries", lambda adapter, params, overrides: [{"q": "a"}, {"q": "b"}]), \
+             mock.patch.object(main, "FETCH_DEADLINE_SECONDS", 0):
+            self.fetch(src)
+        self.assertEqual([r["q"] for r in self.api.requests], ["a"])
+
+
+class WatermarkTest(unittest.TestCase):
+
+    now = 1_000_000
+
+    def setUp(self):
+        self.store = main.SeenStore(":memory:")
+        for target, name, value in ((main, "STORE", self.store), (main.time, "time", lambda: self.now)):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_without_a_stored_watermark_the_window_applies(self):
+        watermark = main.Watermark("test", 3600)
+        self.assertTrue(watermark.accepts(self.now - 3600, "a"))
+        self.assertFalse(watermark.accepts(self.now - 3601, "b"))
+        self.assertFalse(watermark.accepts(None, "c"))
+        self.assertTrue(watermark.is_new(self.now - 3600))
+
+    def test_cutoff_trails_the_stored_watermark_by_the_grace_period(self):
+        self.store.save_watermark("test", self.now - 600, "test_9")
+        watermark = main.Watermark("test", 3600)
+        self.assertEqual(watermark.cutoff, self.now - 600 - main.WATERMARK_GRACE_MINUTES * 60)
+        self.assertFalse(watermark.is_new(self.now - 600))
+        self.assertTrue(watermark.is_new(self.now - 599))
+        self.assertTrue(watermark.reached("test_9"))
+
+    def test_cutoff_reaches_back_at_most_the_max_lookback(self):
+        self.store.save_watermark("test", self.now - 30 * 24 * 3600, "old")
+        watermark = main.Watermark("test", 3600)
+        self.assertEqual(watermark.cutoff, self.now - main.WATERMARK_MAX_LOOKBACK_HOURS * 3600)
+
+    def test_commit_saves_the_newest_accepted_posting_once_handled(self):
+        watermark = main.Watermark("test", 3600)
+        for epoch, job_id in ((self.now - 300, "a"), (self.now - 60, "b"), (self.now - 120, "c")):
+            watermark.accepts(epoch, job_id)
+        _, commits, _ = main.run_with_commits(watermark.commit)
+        self.assertIsNone(self.store.get_watermark("test"))
+        for commit in commits:
+            commit()
+        self.assertEqual(self.store.get_watermark("test"), (self.now - 60, "b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Tests for HTML description normalization
+"""
+import os
+import unittest
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class HtmlToTextTest(unittest.TestCase):
+
+    def test_tags_scripts_and_comments_are_removed(self):
+        markup = '<!DOCTYPE html><p class="x">Build <b>React</b> apps</p><script>var a = "<p>";</script><!-- note --><br/>today'
+        self.assertEqual(main.html_to_text(markup), "Build React apps today")
+
+    def test_bare_angle_brackets_stay_text(self):
+        self.assertEqual(main.html_to_text("Salary <$120k, must know Python > 3 projects"),
+                         "Salary <$120k, must know Python > 3 projects")
+        self.assertEqual(main.html_to_text("<p>a < b and c > d</p>"), "a < b and c > d")
+
+    def test_entities_are_unescaped_after_tags(self):
+        self.assertEqual(main.html_to_text("&lt;b&gt;C# &amp; .NET"), "<b>C# & .NET")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Tests for keyword matching
+"""
+import os
+import unittest
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class KeywordMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = main.KeywordMatcher(["ai", "api", "git", "rest", "c#", ".net", "react", "postgres", "postgresql", "machine learning"])
+
+    def test_short_keywords_match_whole_words_only(self):
+        self.assertEqual(self.matcher.find("We maintain rapid digital interest"), [])
+        self.assertEqual(self.matcher.find("AI/ML, an api-first REST service; git."), ["ai", "api", "git", "rest"])
+
+    def test_punctuated_and_long_keywords_match_as_substrings(self):
+        self.assertEqual(self.matcher.find("C#/.NET and ReactJS on PostgreSQL"), ["c#", ".net", "react", "postgres", "postgresql"])
+        self.assertEqual(self.matcher.find("Applied Machine Learning"), ["machine learning"])
+
+    def test_empty_text(self):
+        self.assertEqual(self.matcher.find(""), [])
+        self.assertEqual(self.matcher.find(None), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
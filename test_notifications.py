@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for dedup, notification and when jobs are marked seen
+"""
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+def job(job_id, source, title="React Developer", company="Acme", **fields):
+    return main.Job(job_id, source, title, company, url=f"https://example.com/{job_id}", **fields)
+
+
+class NotifyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = main.SeenStore(":memory:")
+        self.sent = []
+        for name, value in (("STORE", self.store), ("DUPES", main.DuplicateIndex(3600)),
+                            ("notify_telegram", self.sent.append)):
+            patcher = mock.patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_jobs_are_marked_seen_only_once_notified(self):
+        pending = {}
+        main.collect_new_jobs([job("a_1", "a"), job("a_2", "a", title="Python Engineer")], pending)
+        main.collect_new_jobs([job("b_1", "b")], pending)
+        self.assertEqual(list(pending), ["a_1", "a_2"])
+        self.assertEqual(self.store.seen_ids(["a_1", "a_2", "b_1"]), set())
+        
+        self.assertEqual(main.send_notifications(pending), [])
+        self.assertEqual(len(self.sent), 2)
+        self.assertIn("b: https://example.com/b_1", self.sent[0])
+        self.assertEqual(self.store.seen_ids(["a_1", "a_2", "b_1"]), {"a_1", "a_2", "b_1"})
+
+    def test_a_failing_message_leaves_only_that_job_unseen(self):
+        pending = {}
+        main.collect_new_jobs([job("a_1", "a", salary_min="lots"), job("a_2", "a", title="Python Engineer")], pending)
+        self.assertEqual(main.send_notifications(pending), ["a_1"])
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.store.seen_ids(["a_1", "a_2"]), {"a_2"})
+
+    def test_copy_of_an_earlier_notification_is_dropped_and_marked_seen(self):
+        pending = {}
+        main.collect_new_jobs([job("a_1", "a")], pending)
+        main.send_notifications(pending)
+        pending = {}
+        self.assertEqual(main.collect_new_jobs([job("b_1", "b")], pending), 0)
+        self.assertEqual(pending, {})
+        self.assertEqual(self.store.seen_ids(["b_1"]), {"b_1"})
+
+
+class FormatJobMessageTest(unittest.TestCase):
+
+    def test_adapter_details_follow_the_adapter_not_the_source_id(self):
+        extra = job("glassdoor_germany_1", "glassdoor_germany", adapter=main.ADAPTERS["glassdoor"].label,
+                    extras={"company_rating": 4.2, "easy_apply": True, "age_days": 1})
+        message = main.format_job_message(extra)
+        self.assertIn("Company Rating: 4.2/5", message)
+        self.assertIn("Easy Apply: Yes", message)
+        self.assertIn("Posted: Yesterday", message)
+
+    def test_jobs_from_scan_page_carry_their_adapter(self):
+        adapter = main.SourceAdapter("Test Board", "http://localhost/",
+                                     lambda item: {"native_id": 1, "title": "React Developer", "text": [], "html": []},
+                                     window=None)
+        found = {}
+        with mock.patch.object(main, "STORE", None):
+            main.scan_page(main.Source("Test", adapter, "test"), [{}], None, found)
+        self.assertEqual([j.adapter for j in found.values()], ["Test Board"])
+
+
+class FetchStageHandlerErrorTest(unittest.TestCase):
+
+    def test_handler_error_skips_that_sources_commits_only(self):
+        committed, handled = [], []
+
+        def fetcher(name):
+            def fetch():
+                main.defer_commit(lambda: committed.append(name))
+                return [name]
+            return fetch
+
+        def on_result(name, jobs):
+            if name == "test-broken":
+                raise RuntimeError("database is locked")
+            handled.append(name)
+
+        sources = [("test-broken", fetcher("test-broken")), ("test-working", fetcher("test-working"))]
+        commits = {}
+        main.fetch_all_concurrently(sources, 10, on_result, commits)
+        self.assertEqual(handled, ["test-working"])
+        self.assertEqual(committed, [])
+        self.assertEqual(list(commits), ["test-working"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for planning upstream queries from KEYWORDS
+"""
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+def plans(adapter, overrides=None):
+    return main.Source("Test", main.ADAPTERS[adapter], "test", overrides or {}).plans()[1]
+
+
+class PlanQueriesTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(main, "KEYWORDS", ["react", "full stack", "c#", "python"])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_keywords_narrow_the_role_query(self):
+        [params] = plans("indeed")
+        self.assertEqual(params["query"], 'developer (react OR "full stack" OR "c#" OR python)')
+
+    def test_title_filter_becomes_an_advanced_filter_anded_with_the_roles(self):
+        for adapter in ("linkedin", "active_jobs"):
+            with self.subTest(adapter=adapter):
+                [params] = plans(adapter)
+                self.assertNotIn("title_filter", params)
+                self.assertEqual(params["advanced_title_filter"],
+                                 "(developer | engineer | programmer | software) & (react | 'full stack' | 'c#' | python)")
+
+    def test_too_many_splits_keep_the_default_query(self):
+        with mock.patch.object(main, "KEYWORDS", [f"keyword{i}" for i in range(600)]):
+            [params] = plans("linkedin")
+        self.assertEqual(params["title_filter"], "developer OR engineer OR programmer OR software")
+        self.assertNotIn("advanced_title_filter", params)
+
+    def test_explicit_source_params_are_kept(self):
+        [params] = plans("linkedin", {"title_filter": "rust"})
+        self.assertEqual(params["title_filter"], "rust")
+        self.assertNotIn("advanced_title_filter", params)
+        [params] = plans("indeed", {"query": "golang"})
+        self.assertEqual(params["query"], "golang")
+
+
+class CountryTest(unittest.TestCase):
+
+    def test_location_params_follow_country(self):
+        with mock.patch.object(main, "COUNTRY", "uk"):
+            self.assertEqual(plans("jsearch")[0]["country"], "gb")
+            self.assertEqual(plans("linkedin")[0]["location_filter"], "United Kingdom OR Remote")
+            self.assertEqual(plans("active_jobs")[0]["location_filter"], "United Kingdom OR Remote")
+            self.assertEqual(plans("glassdoor")[0]["location"], "United Kingdom")
+            indeed = plans("indeed")[0]
+            self.assertEqual((indeed["location"], indeed["locality"]), ("United Kingdom", "gb"))
+            url, _ = main.Source("Test", main.ADAPTERS["adzuna"], "test").endpoint()
+            self.assertIn("/jobs/gb/search/", url)
+
+    def test_source_params_override_country(self):
+        with mock.patch.object(main, "COUNTRY", "de"):
+            self.assertEqual(plans("glassdoor", {"location": "Canada"})[0]["location"], "Canada")
+
+
+if __name__ == "__main__":
+    unittest.main()
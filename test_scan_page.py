@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-page filter pipeline
+"""
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class FakeStore:
+    """Records seen_ids calls; "seen-*" IDs count as already notified"""
+
+    def __init__(self):
+        self.calls = []
+
+    def seen_ids(self, ids):
+        ids = list(ids)
+        self.calls.append(ids)
+        return {i for i in ids if "seen-" in i}
+
+
+def parse(item):
+    return {"native_id": item["id"], "epoch": item.get("epoch"), "title": item["title"], "company": "Acme",
+            "text": [item["title"]], "html": []}
+
+
+class FakeWatermark:
+    """Watermark with a fixed cutoff and no stored state"""
+
+    def __init__(self, cutoff, last_id=None):
+        self.cutoff = cutoff
+        self.last_id = last_id
+        self.newest = None
+
+    def accepts(self, epoch, job_id=None):
+        return epoch is not None and epoch >= self.cutoff
+
+    def is_new(self, epoch):
+        return True
+
+    def reached(self, job_id):
+        return job_id == self.last_id
+
+
+class ScanPageTest(unittest.TestCase):
+
+    def setUp(self):
+        adapter = main.SourceAdapter("Test", "http://localhost/", parse, window=None)
+        self.src = main.Source("Test", adapter, "test")
+        self.store = FakeStore()
+        patcher = mock.patch.object(main, "STORE", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_seen_lookup_per_small_page(self):
+        items = [{"id": "seen-1", "title": "React Developer"}, {"id": "new-1", "title": "React Developer"},
+                 {"id": "new-2", "title": "Chef"}, {"id": "seen-2", "title": "Python Engineer"}]
+        found = {}
+        count, fresh, stopped = main.scan_page(self.src, items, None, found)
+        self.assertEqual(len(self.store.calls), 1)
+        self.assertEqual(len(self.store.calls[0]), 4)
+        self.assertEqual(list(found), ["test_new-1"])
+        self.assertEqual((count, stopped), (4, False))
+
+    def test_seen_lookups_in_batches(self):
+        items = [{"id": f"new-{i}", "title": "Chef"} for i in range(main.SCAN_BATCH * 2 + 5)]
+        main.scan_page(self.src, items, None, {})
+        self.assertEqual([len(ids) for ids in self.store.calls], [main.SCAN_BATCH, main.SCAN_BATCH, 5])
+
+    def test_date_sorted_listing_stops_reading_at_the_cutoff(self):
+        src = main.Source("Test", main.SourceAdapter("Test", "http://localhost/", parse, newest_first=True), "test")
+        read = []
+
+        def items():
+            for i in range(1000):
+                read.append(i)
+                yield {"id": f"new-{i}", "title": "React Developer", "epoch": 1000 - i}
+
+        found = {}
+        count, fresh, stopped = main.scan_page(src, items(), FakeWatermark(cutoff=995), found)
+        self.assertTrue(stopped)
+        self.assertEqual(len(read), 7)
+        self.assertEqual(len(found), 6)
+
+    def test_date_sorted_listing_stops_at_the_last_processed_id(self):
+        src = main.Source("Test", main.SourceAdapter("Test", "http://localhost/", parse, newest_first=True), "test")
+        items = iter([{"id": f"new-{i}", "title": "Chef", "epoch": 1000 - i} for i in range(10)])
+        count, fresh, stopped = main.scan_page(src, items, FakeWatermark(cutoff=0, last_id="test_new-3"), {})
+        self.assertEqual((count, stopped), (4, True))
+        self.assertEqual(len(list(items)), 6)
+
+    def test_raw_payload_only_kept_when_enabled(self):
+        items = [{"id": "new-4", "title": "React Developer", "extra": "x"}]
+        found = {}
+        main.scan_page(self.src, items, None, found)
+        self.assertIsNone(found["test_new-4"].raw)
+        with mock.patch.object(main, "KEEP_RAW_PAYLOADS", True):
+            found = {}
+            main.scan_page(self.src, [{"id": "new-5", "title": "React Developer", "extra": "x"}], None, found)
+        self.assertEqual(found["test_new-5"].raw_payload()["extra"], "x")
+
+    def test_items_before_a_stream_error_are_still_filtered(self):
+        def items():
+            yield {"id": "new-3", "title": "Python Developer"}
+            raise ValueError("Test stream error")
+        found = {}
+        with self.assertRaises(ValueError):
+            main.scan_page(self.src, items(), None, found)
+        self.assertEqual(list(found), ["test_new-3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
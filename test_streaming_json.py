@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming JSON parser and the fetch stage's commit handling
+"""
+import json
+import os
+import unittest
+
+import requests
+
+os.environ.setdefault("DB_PATH", ":memory:")
+import main
+
+
+class FakeResponse:
+    """Just enough of requests.Response for iter_json_items"""
+
+    def __init__(self, body, chunk_size, fail_after=None):
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.chunk_size = chunk_size
+        self.fail_after = fail_after
+        self.raw = None
+        self._content = b""
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        for i in range(0, len(self.body), self.chunk_size):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+            yield self.body[i:i + self.chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+def parse(body, chunk_size, path=()):
+    return list(main.iter_json_items(FakeResponse(body, chunk_size), path))
+
+
+class IterJsonItemsTest(unittest.TestCase):
+
+    def test_top_level_array_at_every_chunk_size(self):
+        items = [1234567, 3.14159, -2.5e-3, {"a": [1, 2.5e3], "b": "x,]"}, "text", True, None, 0]
+        body = json.dumps(items)
+        for size in range(1, len(body) + 1):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(parse(body, size), items)
+
+    def test_path_skips_numeric_siblings_at_every_chunk_size(self):
+        body = json.dumps({"meta": 12.75, "count": 1e3, "skip": [1.5, {"x": 2}], "data": {"jobListings": [1.25, {"id": 7}]}})
+        for size in range(1, len(body) + 1):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(parse(body, size, ("data", "jobListings")), [1.25, {"id": 7}])
+
+    def test_number_at_end_of_body(self):
+        self.assertEqual(parse("[1, 22.5]", 8), [1, 22.5])
+
+    def test_missing_key_or_empty_array_yields_nothing(self):
+        self.assertEqual(parse('{"other": [1, 2]}', 3, ("data",)), [])
+        self.assertEqual(parse("[]", 1), [])
+        self.assertEqual(parse('{"data": []}', 2, ("data",)), [])
+
+    def test_truncated_body_raises(self):
+        with self.assertRaises(ValueError):
+            parse('[{"id": 1}, {"id": 2', 4)
+
+    def test_connection_error_mid_stream_raises(self):
+        r = FakeResponse(json.dumps([{"id": i} for i in range(50)]), 16, fail_after=150)
+        seen = []
+        with self.assertRaises(ValueError):
+            for item in main.iter_json_items(r):
+                seen.append(item)
+        self.assertLess(len(seen), 50)
+        self.assertTrue(r.closed)
+
+
+class FetchStageCommitTest(unittest.TestCase):
+
+    def test_commits_dropped_for_failed_fetch(self):
+        committed = []
+
+        def failing():
+            main.defer_commit(lambda: committed.append("failing"))
+            main.mark_fetch_failed()
+            return []
+
+        def working():
+            main.defer_commit(lambda: committed.append("working"))
+            return []
+
+        main.fetch_all_concurrently([("test-failing", failing), ("test-working", working)], 10, lambda name, jobs: None)
+        self.assertEqual(committed, ["working"])
+
+
+if __name__ == "__main__":
+    unittest.main()